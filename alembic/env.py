@@ -11,6 +11,8 @@ from app.schemas.user import User
 from app.schemas.refresh_token import RefreshToken
 from app.schemas.holding import Holding
 from app.schemas.investment_preference import InvestmentPreference
+from app.schemas.stock_price import StockPrice
+from app.schemas.portfolio_snapshot import PortfolioSnapshot
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -6,6 +6,8 @@ from sqlalchemy.orm import Session
 from app.core.config import settings
 from app.db.session import get_db
 from app.schemas.user import User
+from app.services.ism_api import ISMApi, ism_api
+from app.services.portfolio_context import PortfolioContext
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
@@ -26,3 +28,12 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     if not user or not user.is_active:
         raise credentials_exception
     return user
+
+
+def get_ism_api() -> ISMApi:
+    return ism_api
+
+
+def get_portfolio_context(db: Session = Depends(get_db), current_user: User = Depends(get_current_user), ism_api: ISMApi = Depends(get_ism_api)) -> PortfolioContext:
+    # Resolved once per request, every route parameter asking for it gets the same instance
+    return PortfolioContext(db, current_user, ism_api)
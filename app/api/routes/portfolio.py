@@ -1,29 +1,32 @@
+import dataclasses
+import datetime
 import json
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from app.db.session import get_db
-from app.api.deps import get_current_user
-from app.models.portfolio_metrics import PortfolioMetricsResponse, PortfolioRiskMetricsResponse
+from app.api.deps import get_current_user, get_portfolio_context
+from app.core.config import settings
+from app.models.portfolio_history import HistoryInterval, PortfolioHistoryResponse
+from app.models.portfolio_metrics import DashboardSection, HoldingMetrics, PortfolioDashboardResponse, PortfolioMetricsResponse, PortfolioRiskMetricsResponse
 from app.schemas.user import User
-from app.schemas.holding import Holding
 from app.services.investment_advice import InvestmentAdvice
 from app.services.openai_api import OpenAIAPI
+from app.services.portfolio_history import load_portfolio_history
+from app.services.portfolio_context import PortfolioContext
 from app.services.portfolio_metrics import PortfolioMetrics
-from app.services.ism_api import ISMApi
 
 
 router = APIRouter(prefix="/api/v1/portfolio", tags=["Portfolio"])
 
 @router.get("/metrics/current_value_and_pnl", response_model=PortfolioMetricsResponse)
-async def get_portfolio_current_value_and_pnl(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)): 
+async def get_portfolio_current_value_and_pnl(context: PortfolioContext = Depends(get_portfolio_context)): 
     try:
-        holdings = db.query(Holding).filter(Holding.user_id == current_user.id).all()
+        portfolio_metrics = PortfolioMetrics(context.ism_api, context=context)
         
-        ism_api = ISMApi()
-        portfolio_metrics = PortfolioMetrics(ism_api)
-        
-        holding_metrics, portfolio_summary, _ = await portfolio_metrics.calculate_current_value_and_pnl(holdings)
+        holding_metrics, portfolio_summary, _ = await portfolio_metrics.calculate_current_value_and_pnl(context.holdings)
 
         return PortfolioMetricsResponse(
             holding_metrics=holding_metrics,
@@ -32,16 +35,68 @@ async def get_portfolio_current_value_and_pnl(db: Session = Depends(get_db), cur
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error calculating portfolio current value and P&L: {str(e)}")
     
-@router.get("/genai/analysis", response_model=dict)
-async def analyze_portfolio_genai(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def _sse_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@router.get("/metrics/current_value_and_pnl/stream", response_class=StreamingResponse)
+async def stream_portfolio_current_value_and_pnl(context: PortfolioContext = Depends(get_portfolio_context)):
+    """
+    Server-sent events: a `holding` event per holding row as its quote resolves, then one
+    `summary` event with the portfolio summary and weights, or an `error` event.
+    """
+    # Loaded before streaming starts, the request's DB session closes once the response begins
+    holdings = context.holdings
+    portfolio_metrics = PortfolioMetrics(context.ism_api, context=context)
+
+    async def events():
+        try:
+            async for item in portfolio_metrics.stream_current_value_and_pnl(holdings):
+                yield _sse_event("holding" if isinstance(item, HoldingMetrics) else "summary", dataclasses.asdict(item))
+        except Exception as e:
+            yield _sse_event("error", {"detail": f"Error streaming portfolio current value and P&L: {str(e)}"})
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@router.get("/dashboard", response_model=PortfolioDashboardResponse, response_model_exclude_none=True)
+async def get_portfolio_dashboard(
+    fields: Optional[str] = Query(None, description="Comma-separated sections: holdings, summary, risk, concentration. All when omitted."),
+    context: PortfolioContext = Depends(get_portfolio_context),
+):
+    try:
+        sections = {DashboardSection(field.strip()) for field in fields.split(",") if field.strip()} if fields else set(DashboardSection)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"fields must be a comma-separated subset of: {', '.join(section.value for section in DashboardSection)}")
+    try:
+        portfolio_metrics = PortfolioMetrics(context.ism_api, context=context)
+
+        return await portfolio_metrics.calculate_dashboard(context.holdings, sections)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error calculating portfolio dashboard: {str(e)}")
+
+@router.get("/history", response_model=PortfolioHistoryResponse)
+def get_portfolio_history(
+    interval: HistoryInterval = HistoryInterval.DAILY,
+    start: Optional[datetime.date] = None,
+    end: Optional[datetime.date] = None,
+    after: Optional[datetime.date] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(settings.PORTFOLIO_HISTORY_PAGE_SIZE, ge=1, le=settings.PORTFOLIO_HISTORY_MAX_PAGE_SIZE),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    if start and end and start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
     try:
-        holdings = db.query(Holding).filter(Holding.user_id == current_user.id).all()
+        return load_portfolio_history(db, current_user.id, interval=interval, start=start, end=end, after=after, limit=limit)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching portfolio history: {str(e)}")
 
-        ism_api = ISMApi()
+@router.get("/genai/analysis", response_model=dict)
+async def analyze_portfolio_genai(context: PortfolioContext = Depends(get_portfolio_context)):
+    try:
         openai_api = OpenAIAPI()
-        portfolio_metrics = PortfolioMetrics(ism_api, openai_api)
+        portfolio_metrics = PortfolioMetrics(context.ism_api, openai_api, context=context)
 
-        analysis = await portfolio_metrics.analyze_portfolio_genai(holdings=holdings, user_id=current_user.id)
+        analysis = await portfolio_metrics.analyze_portfolio_genai(holdings=context.holdings, user_id=context.user.id)
 
         if isinstance(analysis, str):
             analysis = json.loads(analysis)
@@ -51,14 +106,11 @@ async def analyze_portfolio_genai(db: Session = Depends(get_db), current_user: U
         raise HTTPException(status_code=500, detail=f"Error analyzing portfolio: {str(e)}")
 
 @router.get("/metrics/risk", response_model=PortfolioRiskMetricsResponse)
-async def get_portfolio_risk_metrics(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def get_portfolio_risk_metrics(context: PortfolioContext = Depends(get_portfolio_context)):
     try:
-        holdings = db.query(Holding).filter(Holding.user_id == current_user.id).all()
+        portfolio_metrics = PortfolioMetrics(context.ism_api, context=context)
 
-        ism_api = ISMApi()
-        portfolio_metrics = PortfolioMetrics(ism_api)
-
-        stock_risk_metrics_list, portfolio_risk_metrics = await portfolio_metrics.calculate_risk_metrics(holdings)
+        stock_risk_metrics_list, portfolio_risk_metrics = await portfolio_metrics.calculate_risk_metrics(context.holdings)
 
         return PortfolioRiskMetricsResponse(
             stocks_risk_metrics=stock_risk_metrics_list,
@@ -68,15 +120,12 @@ async def get_portfolio_risk_metrics(db: Session = Depends(get_db), current_user
         raise HTTPException(status_code=500, detail=f"Error fetching portfolio risk metrics: {str(e)}")
     
 @router.get("/genai/risk-analysis", response_model=dict)
-async def analyze_portfolio_risk_genai(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def analyze_portfolio_risk_genai(context: PortfolioContext = Depends(get_portfolio_context)):
     try:
-        holdings = db.query(Holding).filter(Holding.user_id == current_user.id).all()
-
-        ism_api = ISMApi()
         openai_api = OpenAIAPI()
-        portfolio_metrics = PortfolioMetrics(ism_api, openai_api)
+        portfolio_metrics = PortfolioMetrics(context.ism_api, openai_api, context=context)
 
-        analysis = await portfolio_metrics.analyze_portfolio_risk_genai(holdings=holdings, user_id=current_user.id)
+        analysis = await portfolio_metrics.analyze_portfolio_risk_genai(holdings=context.holdings, user_id=context.user.id)
 
         if isinstance(analysis, str):
             analysis = json.loads(analysis)
@@ -86,15 +135,12 @@ async def analyze_portfolio_risk_genai(db: Session = Depends(get_db), current_us
         raise HTTPException(status_code=500, detail=f"Error analyzing portfolio risk: {str(e)}")
 
 @router.get("/genai/comprehensive-analysis", response_model=dict)
-async def analyze_portfolio_comprehensive_advisory_genai(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def analyze_portfolio_comprehensive_advisory_genai(context: PortfolioContext = Depends(get_portfolio_context)):
     try:
-        holdings = db.query(Holding).filter(Holding.user_id == current_user.id).all()
-
-        ism_api = ISMApi()
         openai_api = OpenAIAPI()
-        investment_advice = InvestmentAdvice(db, ism_api, openai_api)
+        investment_advice = InvestmentAdvice(context.db, context.ism_api, openai_api, context=context)
 
-        analysis = await investment_advice.generate_comprehensive_advisory_genai(holdings=holdings, user_id=current_user.id)
+        analysis = await investment_advice.generate_comprehensive_advisory_genai(holdings=context.holdings, user_id=context.user.id)
 
         if isinstance(analysis, str):
             analysis = json.loads(analysis)
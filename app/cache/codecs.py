@@ -0,0 +1,132 @@
+import json
+import struct
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Every payload written by CacheCodec starts with this byte. It can't start a
+# JSON document, so values stored as plain json.dumps text still decode.
+MAGIC = 0xA1
+FORMAT_VERSION = 2
+# Version 2 appends the soft expiry as unix seconds, 0 when the entry has none
+HEADER_SIZES = {1: 4, 2: 8}
+SOFT_EXPIRY = struct.Struct(">I")
+
+
+@dataclass(frozen=True)
+class Serializer:
+    id: int
+    name: str
+    dumps: Callable[[Any], bytes]
+    loads: Callable[[bytes], Any]
+    # Payload is JSON text, so Pydantic can validate it with model_validate_json
+    is_json: bool
+
+
+@dataclass(frozen=True)
+class Compressor:
+    id: int
+    name: str
+    compress: Callable[[bytes], bytes]
+    decompress: Callable[[bytes], bytes]
+
+
+SERIALIZERS: Dict[int, Serializer] = {
+    0: Serializer(0, "json", lambda value: json.dumps(value).encode(), json.loads, True),
+}
+if orjson is not None:
+    SERIALIZERS[1] = Serializer(1, "orjson", orjson.dumps, orjson.loads, True)
+if msgpack is not None:
+    SERIALIZERS[2] = Serializer(2, "msgpack", lambda value: msgpack.packb(value, use_bin_type=True), lambda payload: msgpack.unpackb(payload, raw=False), False)
+
+COMPRESSORS: Dict[int, Compressor] = {
+    0: Compressor(0, "none", lambda payload: payload, lambda payload: payload),
+    1: Compressor(1, "zlib", lambda payload: zlib.compress(payload, 6), zlib.decompress),
+}
+if zstandard is not None:
+    COMPRESSORS[2] = Compressor(2, "zstd", zstandard.ZstdCompressor(level=3).compress, lambda payload: zstandard.ZstdDecompressor().decompress(payload))
+
+
+def _by_name(registry: Dict[int, Any], name: str, fallback: str) -> Any:
+    for entry in registry.values():
+        if entry.name == name:
+            return entry
+    print(f"Cache codec {name} is not available, falling back to {fallback}")
+    return _by_name(registry, fallback, fallback)
+
+
+@dataclass
+class DecodedPayload:
+    serializer: Serializer
+    payload: bytes
+    soft_expires_at: Optional[int] = None
+
+    @property
+    def is_stale(self) -> bool:
+        """Past its soft expiry, still servable but due for a refresh"""
+        return self.soft_expires_at is not None and time.time() >= self.soft_expires_at
+
+    def value(self) -> Any:
+        return self.serializer.loads(self.payload)
+
+
+class CacheCodec:
+    """
+    Serializes cache values with a small versioned header:
+
+        magic (1 byte) | format version | serializer id | compressor id | soft expiry (4 bytes) | payload
+
+    Values are compressed only above `compression_min_bytes`. Decoding reads
+    the ids from the header, so a deploy can switch serializer or compressor
+    while entries written in the old format are still in Redis.
+    """
+
+    def __init__(self, serializer: str, compressor: str, compression_min_bytes: int):
+        self.serializer: Serializer = _by_name(SERIALIZERS, serializer, "json")
+        self.compressor: Compressor = _by_name(COMPRESSORS, compressor, "none")
+        self.compression_min_bytes = compression_min_bytes
+
+    def encode(self, value: Any, soft_expires_at: Optional[float] = None) -> bytes:
+        payload = self.serializer.dumps(value)
+        compressor = COMPRESSORS[0]
+        if len(payload) >= self.compression_min_bytes:
+            compressor = self.compressor
+            payload = compressor.compress(payload)
+        header = bytes((MAGIC, FORMAT_VERSION, self.serializer.id, compressor.id))
+        return header + SOFT_EXPIRY.pack(int(soft_expires_at or 0)) + payload
+
+    def decode_payload(self, data: Optional[bytes]) -> Optional[DecodedPayload]:
+        if not data:
+            return None
+        if data[0] != MAGIC:
+            # Written before the codec layer existed
+            return DecodedPayload(SERIALIZERS[0], data)
+        version, serializer_id, compressor_id = data[1], data[2], data[3]
+        if version not in HEADER_SIZES:
+            raise ValueError(f"Unsupported cache format version {version}")
+        soft_expires_at = SOFT_EXPIRY.unpack_from(data, 4)[0] if version >= 2 else 0
+        return DecodedPayload(
+            serializer=SERIALIZERS[serializer_id],
+            payload=COMPRESSORS[compressor_id].decompress(data[HEADER_SIZES[version]:]),
+            soft_expires_at=soft_expires_at or None,
+        )
+
+    def decode(self, data: Optional[bytes]) -> Optional[Any]:
+        decoded = self.decode_payload(data)
+        return decoded.value() if decoded else None
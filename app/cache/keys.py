@@ -0,0 +1,104 @@
+import hashlib
+import json
+from typing import Dict, Optional, Type
+
+from pydantic import BaseModel
+
+from app.cache.redis import CACHE_INVALIDATION_CHANNEL, WORKER_ID, RedisService
+from app.core.config import settings
+from app.models.ism_api.historical import PriceHistory
+from app.models.ism_api.news import ISMNewsArticle
+from app.models.ism_api.stock import ISMStockDetailsResponse, ISMTrendingStocksResponse, RecentNews, StockQuote
+from app.models.portfolio_metrics import CovarianceEstimate, PortfolioMetricsResponse, ValueAtRisk
+
+
+def schema_version(*models: Type[BaseModel], revision: int = 1) -> str:
+    """Short hash of the models' JSON schemas, changes whenever a cached model's shape does"""
+    schemas = [model.model_json_schema(by_alias=True) for model in models]
+    digest = hashlib.sha256(json.dumps([revision, schemas], sort_keys=True).encode()).hexdigest()
+    return digest[:8]
+
+
+class CacheKeyBuilder:
+    """
+    Builds every Redis key the app uses, so all of them live under one namespace.
+
+    Cached values are keyed `{namespace}:{family}:v{schema}:g{generation}:{parts}`.
+    The schema hash moves a family to fresh keys when its models change, and
+    bumping the generation moves every family at once; old keys are never read
+    again and age out on their TTL. Coordination keys (locks, leases, rate
+    limits) use `{namespace}:{family}:{parts}` and survive both.
+    """
+
+    def __init__(self, namespace: str):
+        self.namespace = namespace
+        self.generation = 0
+        self._versions: Dict[str, str] = {}
+
+    @property
+    def generation_key(self) -> str:
+        return f"{self.namespace}:generation"
+
+    def register(self, family: str, *models: Type[BaseModel], revision: int = 1) -> None:
+        """
+        Declare a cached family and the models its values are validated as.
+        Bump revision when the stored shape changes without a model change, e.g. a GenAI prompt.
+        """
+        self._versions[family] = schema_version(*models, revision=revision)
+
+    def key(self, family: str, *parts: str) -> str:
+        """Key of a cached value"""
+        version = self._versions.get(family)
+        if version is None:
+            raise ValueError(f"Cache key family {family} is not registered")
+        return ":".join([self.namespace, family, f"v{version}", f"g{self.generation}", *parts])
+
+    def fixed(self, family: str, *parts: str) -> str:
+        """Key that is not versioned, for coordination state rather than cached values"""
+        return ":".join([self.namespace, family, *parts])
+
+    def prefix(self, family: Optional[str] = None) -> str:
+        """Prefix matching every key of family across versions and generations, or the whole namespace"""
+        return f"{self.namespace}:{family}:" if family else f"{self.namespace}:"
+
+    async def load_generation(self) -> int:
+        """Read the current generation, called at startup and whenever invalidation messages may have been missed"""
+        generation = await RedisService().get_counter(self.generation_key)
+        if generation is not None:
+            self.generation = generation
+        return self.generation
+
+    async def bump_generation(self) -> int:
+        """Invalidate every cached value in the namespace, all workers switch to the new generation"""
+        cache = RedisService()
+        generation = await cache.incr(self.generation_key)
+        if generation is None:
+            raise RuntimeError("Could not bump the cache generation")
+        self.generation = generation
+        await cache.publish(CACHE_INVALIDATION_CHANNEL, json.dumps({"origin": WORKER_ID, "keys": [], "generation": generation}))
+        return generation
+
+    async def clear(self) -> bool:
+        """Delete every key in the namespace, keeping the generation so workers stay in step"""
+        return await RedisService().clear_all(keep=[self.generation_key])
+
+    async def invalidate_family(self, family: str) -> int:
+        """Delete every key of family, returns the number of keys removed"""
+        return await RedisService().delete_prefix(self.prefix(family))
+
+
+cache_keys = CacheKeyBuilder(settings.CACHE_NAMESPACE)
+cache_keys.register("stock_quote", StockQuote)
+cache_keys.register("stock_quote_last_good", StockQuote)
+cache_keys.register("stock_fundamentals", ISMStockDetailsResponse)
+cache_keys.register("stock_news", RecentNews)
+cache_keys.register("news_articles", ISMNewsArticle)
+cache_keys.register("trending_stocks", ISMTrendingStocksResponse)
+cache_keys.register("portfolio_valuation", PortfolioMetricsResponse)
+cache_keys.register("price_history", PriceHistory)
+cache_keys.register("covariance", CovarianceEstimate)
+cache_keys.register("value_at_risk", ValueAtRisk)
+# GenAI responses are stored as the model's raw text, bump the revision with the prompt format
+cache_keys.register("portfolio_briefing_genai")
+cache_keys.register("portfolio_risk_analysis_genai", revision=4)
+cache_keys.register("comprehensive_advisory_genai")
@@ -0,0 +1,113 @@
+import asyncio
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Iterable, Optional, Tuple
+
+from app.cache.keys import cache_keys
+from app.cache.redis import CACHE_INVALIDATION_CHANNEL, WORKER_ID, cache_requests_total, get_redis_client, key_family
+from app.core.config import settings
+
+
+class LocalTTLCache:
+    """
+    In-process cache of already-parsed objects, bounded by size with LRU eviction.
+
+    Entries also expire after `ttl_seconds`, which bounds staleness if an
+    invalidation message published by another worker is missed.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                cache_requests_total.inc(tier="l1", family=key_family(key), result="hit")
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+        cache_requests_total.inc(tier="l1", family=key_family(key), result="miss")
+        return None
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + (ttl_seconds or self.ttl_seconds)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, keys: Iterable[str]) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class CacheInvalidationListener:
+    """
+    Evicts L1 entries when any worker publishes a new version of a key, and
+    follows cache generation bumps so this worker reads and writes the new keys.
+    """
+
+    def __init__(self, cache: LocalTTLCache):
+        self.cache = cache
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            pubsub = get_redis_client().pubsub()
+            try:
+                await pubsub.subscribe(CACHE_INVALIDATION_CHANNEL)
+                # A bump published while this worker wasn't subscribed would otherwise be missed
+                await cache_keys.load_generation()
+                while True:
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if message and message["type"] == "message":
+                        payload = json.loads(message["data"])
+                        if "generation" in payload:
+                            cache_keys.generation = max(cache_keys.generation, payload["generation"])
+                        if payload["origin"] != WORKER_ID:
+                            self.cache.invalidate(payload["keys"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Missed messages are covered by the L1 TTL, drop everything to be safe and resubscribe
+                print(f"Cache invalidation listener error: {str(e)}")
+                self.cache.clear()
+                await asyncio.sleep(1)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+
+local_cache = LocalTTLCache(max_entries=settings.L1_CACHE_MAX_ENTRIES, ttl_seconds=settings.L1_CACHE_TTL_SECONDS)
+cache_invalidation_listener = CacheInvalidationListener(local_cache)
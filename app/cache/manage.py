@@ -0,0 +1,38 @@
+import argparse
+import asyncio
+from typing import List, Optional
+
+from app.cache.keys import cache_keys
+from app.cache.redis import close_redis, init_redis
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m app.cache.manage", description="Invalidate the app's Redis cache without touching other services' keys")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("bump-generation", help="Move every worker to fresh keys, old values age out on their TTL")
+    commands.add_parser("clear", help="Delete every key in the cache namespace, keeping the generation")
+    invalidate = commands.add_parser("invalidate", help="Delete every key of one family, e.g. stock_quote")
+    invalidate.add_argument("family")
+    return parser.parse_args(argv)
+
+
+async def main(argv: Optional[List[str]] = None) -> None:
+    """Operator entry point, replaces FLUSHALL: python -m app.cache.manage {bump-generation,clear,invalidate FAMILY}"""
+    args = parse_args(argv)
+    await init_redis()
+    try:
+        await cache_keys.load_generation()
+        if args.command == "bump-generation":
+            generation = await cache_keys.bump_generation()
+            print(f"Cache generation bumped to {generation}")
+        elif args.command == "clear":
+            await cache_keys.clear()
+        elif args.command == "invalidate":
+            deleted = await cache_keys.invalidate_family(args.family)
+            print(f"Deleted {deleted} keys of cache family {args.family}")
+    finally:
+        await close_redis()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,53 +1,366 @@
 import json
-from typing import Any, Optional
-import redis
+import secrets
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Type, TypeVar
+import redis.asyncio as redis
 from datetime import timedelta
 
+from pydantic import BaseModel
+
+from app.cache.codecs import CacheCodec
 from app.core.config import settings
+from app.core.metrics import metrics
 
-class RedisService:
-    def __init__(self):
-        self._redis = redis.Redis(
+CACHE_INVALIDATION_CHANNEL = "cache_invalidation"
+# Identifies this worker's own invalidation messages so it can ignore them
+WORKER_ID = secrets.token_hex(8)
+
+cache_requests_total = metrics.counter("cache_requests_total", "Cache lookups by tier, key family and result")
+cache_stale_served_total = metrics.counter("cache_stale_served_total", "Values served past their freshness TTL by key family and reason")
+cache_errors_total = metrics.counter("cache_errors_total", "Failed cache operations by key family and operation")
+cache_operation_seconds = metrics.histogram("cache_operation_seconds", "Redis round trip latency by key family and operation")
+
+cache_codec = CacheCodec(
+    serializer=settings.CACHE_SERIALIZER,
+    compressor=settings.CACHE_COMPRESSION,
+    compression_min_bytes=settings.CACHE_COMPRESSION_MIN_BYTES,
+)
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+EXTEND_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("pexpire", KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+def key_family(key: str) -> str:
+    """Key family used to group cache metrics, e.g. stock_quote for alps:stock_quote:v1a2b3c4d:g0:TCS"""
+    parts = key.split(":", 2)
+    if len(parts) > 1 and parts[0] == settings.CACHE_NAMESPACE:
+        return parts[1]
+    return parts[0]
+
+
+def _record_lookup(key: str, hit: bool) -> None:
+    cache_requests_total.inc(tier="l2", family=key_family(key), result="hit" if hit else "miss")
+
+
+@contextmanager
+def _observe(operation: str, key: str) -> Iterator[None]:
+    """Time a Redis call into cache_operation_seconds and count it in cache_errors_total if it raises"""
+    family = key_family(key)
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        cache_errors_total.inc(family=family, operation=operation)
+        raise
+    finally:
+        cache_operation_seconds.observe(time.perf_counter() - started, family=family, operation=operation)
+
+
+def _soft_expires_at(soft_expire_minutes: Optional[int]) -> Optional[float]:
+    return time.time() + soft_expire_minutes * 60 if soft_expire_minutes else None
+
+
+_client: Optional[redis.Redis] = None
+_scripts: Dict[str, Any] = {}
+
+
+def get_redis_client() -> redis.Redis:
+    """Process-wide async client backed by one sized connection pool"""
+    global _client
+    if _client is None:
+        pool = redis.BlockingConnectionPool(
             host=settings.REDIS_HOST,
             port=settings.REDIS_PORT,
-            decode_responses=True,
+            decode_responses=False,
             username=settings.REDIS_USERNAME,
             password=settings.REDIS_PASSWORD,
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+            timeout=settings.REDIS_POOL_TIMEOUT_SECONDS,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+            socket_connect_timeout=settings.REDIS_SOCKET_CONNECT_TIMEOUT_SECONDS,
+            health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL_SECONDS,
         )
+        _client = redis.Redis(connection_pool=pool)
+    return _client
+
+
+async def init_redis() -> None:
+    """Create the connection pool at startup and check the server is reachable"""
+    try:
+        await get_redis_client().ping()
+    except Exception as e:
+        print(f"Redis ping error: {str(e)}")
+
+
+async def close_redis() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose(close_connection_pool=True)
+        _client = None
+        _scripts.clear()
+
+
+@dataclass
+class CacheEntry:
+    key: str
+    value: Any
+    expire_minutes: int = 5
+    only_if_missing: bool = False
+    # Served as stale after this, until expire_minutes removes the key
+    soft_expire_minutes: Optional[int] = None
+
+
+class RedisService:
+    """Thin async wrapper over the shared client, cheap to instantiate anywhere"""
+
+    @property
+    def _redis(self) -> redis.Redis:
+        return get_redis_client()
 
     async def get(self, key: str) -> Optional[Any]:
         """Get value from Redis cache"""
         try:
-            value = self._redis.get(key)
-            return json.loads(value) if value else None
+            with _observe("get", key):
+                value = await self._redis.get(key)
+            _record_lookup(key, bool(value))
+            with _observe("decode", key):
+                return cache_codec.decode(value)
         except Exception as e:
             print(f"Redis get error for {key}: {str(e)}")
             return None
 
-    async def set(self, key: str, value: Any, expire_minutes: int = 5) -> bool:
-        """Set value in Redis cache with expiration"""
+    async def get_with_staleness(self, key: str) -> Tuple[Optional[Any], bool]:
+        """Get value and whether it is past its soft expiry, (None, False) on a miss"""
+        try:
+            with _observe("get", key):
+                value = await self._redis.get(key)
+            _record_lookup(key, bool(value))
+            with _observe("decode", key):
+                decoded = cache_codec.decode_payload(value)
+                if decoded is None:
+                    return None, False
+                return decoded.value(), decoded.is_stale
+        except Exception as e:
+            print(f"Redis get error for {key}: {str(e)}")
+            return None, False
+
+    async def get_many(self, keys: List[str]) -> List[Optional[Any]]:
+        """Get values for keys in one MGET round trip, None for missing keys"""
+        values = []
+        for key, value in zip(keys, await self._mget(keys)):
+            try:
+                values.append(cache_codec.decode(value))
+            except Exception as e:
+                cache_errors_total.inc(family=key_family(key), operation="decode")
+                print(f"Redis decode error for {key}: {str(e)}")
+                values.append(None)
+        return values
+
+    async def get_model(self, key: str, model: Type[ModelT]) -> Optional[ModelT]:
+        """Get a value validated as model, straight from the stored bytes where the codec allows"""
+        return (await self.get_models([key], model))[0]
+
+    async def get_models(self, keys: List[str], model: Type[ModelT]) -> List[Optional[ModelT]]:
+        """Get values for keys validated as model in one MGET round trip, None for missing or invalid keys"""
+        models = []
+        for key, value in zip(keys, await self._mget(keys)):
+            try:
+                decoded = cache_codec.decode_payload(value)
+                if decoded is None:
+                    models.append(None)
+                elif decoded.serializer.is_json:
+                    # Skip building the intermediate dict for JSON payloads
+                    models.append(model.model_validate_json(decoded.payload))
+                else:
+                    models.append(model.model_validate(decoded.value()))
+            except Exception as e:
+                cache_errors_total.inc(family=key_family(key), operation="decode")
+                print(f"Redis decode error for {key}: {str(e)}")
+                models.append(None)
+        return models
+
+    async def _mget(self, keys: List[str]) -> List[Optional[bytes]]:
+        if not keys:
+            return []
+        try:
+            with _observe("mget", keys[0]):
+                values = await self._redis.mget(keys)
+            for key, value in zip(keys, values):
+                _record_lookup(key, bool(value))
+            return values
+        except Exception as e:
+            print(f"Redis mget error for {len(keys)} keys: {str(e)}")
+            return [None] * len(keys)
+
+    async def set(self, key: str, value: Any, expire_minutes: int = 5, only_if_missing: bool = False,
+                  soft_expire_minutes: Optional[int] = None) -> bool:
+        """Set value in Redis cache with expiration, and an optional earlier soft expiry"""
         try:
-            return self._redis.setex(
-                name=key,
-                time=timedelta(minutes=expire_minutes),
-                value=json.dumps(value)
-            )
+            with _observe("set", key):
+                return bool(await self._redis.set(
+                    name=key,
+                    value=cache_codec.encode(value, soft_expires_at=_soft_expires_at(soft_expire_minutes)),
+                    ex=timedelta(minutes=expire_minutes),
+                    nx=only_if_missing,
+                ))
         except Exception as e:
             print(f"Redis set error for {key}: {str(e)}")
             return False
 
+    async def set_many(self, items: Dict[str, Any], expire_minutes: int = 5, only_if_missing: bool = False) -> bool:
+        """Set several values with the same expiration in one pipelined round trip"""
+        return await self.write_many([
+            CacheEntry(key=key, value=value, expire_minutes=expire_minutes, only_if_missing=only_if_missing)
+            for key, value in items.items()
+        ])
+
+    async def write_many(self, entries: List[CacheEntry], invalidate_local: bool = False) -> bool:
+        """
+        Write entries with individual expirations in one pipelined round trip.
+        With invalidate_local, other workers are told to drop their in-process copies.
+        """
+        if not entries:
+            return True
+        try:
+            with _observe("pipeline_set", entries[0].key):
+                async with self._redis.pipeline(transaction=False) as pipe:
+                    for entry in entries:
+                        pipe.set(
+                            name=entry.key,
+                            value=cache_codec.encode(entry.value, soft_expires_at=_soft_expires_at(entry.soft_expire_minutes)),
+                            ex=timedelta(minutes=entry.expire_minutes),
+                            nx=entry.only_if_missing,
+                        )
+                    if invalidate_local:
+                        pipe.publish(CACHE_INVALIDATION_CHANNEL, json.dumps({"origin": WORKER_ID, "keys": [entry.key for entry in entries]}))
+                    await pipe.execute()
+            return True
+        except Exception as e:
+            print(f"Redis pipeline set error for {len(entries)} keys: {str(e)}")
+            return False
+
     async def delete(self, key: str) -> bool:
         """Delete key from Redis cache"""
         try:
-            return bool(self._redis.delete(key))
+            with _observe("delete", key):
+                return bool(await self._redis.delete(key))
         except Exception as e:
             print(f"Redis delete error for {key}: {str(e)}")
             return False
 
-    async def clear_all(self) -> bool:
-        """Clear all keys from Redis cache"""
+    async def exists(self, key: str) -> bool:
+        """Check whether key exists in Redis cache"""
+        try:
+            with _observe("exists", key):
+                return bool(await self._redis.exists(key))
+        except Exception as e:
+            print(f"Redis exists error for {key}: {str(e)}")
+            return False
+
+    async def ttl(self, key: str) -> int:
+        """Remaining time to live of key in seconds, -2 if it does not exist"""
+        try:
+            with _observe("ttl", key):
+                return await self._redis.ttl(key)
+        except Exception as e:
+            print(f"Redis ttl error for {key}: {str(e)}")
+            return -2
+
+    async def acquire_lock(self, key: str, expire_milliseconds: int) -> Optional[str]:
+        """Acquire a short-lived lock, returns the owner token or None if already held"""
+        token = secrets.token_hex(16)
+        try:
+            with _observe("lock", key):
+                acquired = await self._redis.set(key, token, nx=True, px=expire_milliseconds)
+            return token if acquired else None
+        except Exception as e:
+            print(f"Redis lock error for {key}: {str(e)}")
+            return None
+
+    async def release_lock(self, key: str, token: str) -> bool:
+        """Release a lock only if it is still held by token"""
+        return bool(await self.run_script(RELEASE_LOCK_SCRIPT, keys=[key], args=[token]))
+
+    async def extend_lock(self, key: str, token: str, expire_milliseconds: int) -> bool:
+        """Extend a lock only if it is still held by token"""
+        return bool(await self.run_script(EXTEND_LOCK_SCRIPT, keys=[key], args=[token, expire_milliseconds]))
+
+    async def run_script(self, script: str, keys: List[str], args: List[Any]) -> Optional[Any]:
+        """Run a Lua script via EVALSHA, returns None if Redis is unavailable"""
         try:
-            return bool(self._redis.flushall())
+            registered = _scripts.get(script)
+            if registered is None:
+                registered = _scripts[script] = self._redis.register_script(script)
+            with _observe("script", keys[0] if keys else ""):
+                return await registered(keys=keys, args=args)
         except Exception as e:
-            print(f"Redis clear error: {str(e)}")
-            return False
\ No newline at end of file
+            print(f"Redis script error for {keys}: {str(e)}")
+            return None
+
+    async def get_counter(self, key: str) -> Optional[int]:
+        """Get an integer counter written with incr, None if missing or Redis is unavailable"""
+        try:
+            value = await self._redis.get(key)
+            return int(value) if value is not None else None
+        except Exception as e:
+            print(f"Redis get error for {key}: {str(e)}")
+            return None
+
+    async def incr(self, key: str) -> Optional[int]:
+        """Increment an integer counter, returns the new value or None if Redis is unavailable"""
+        try:
+            return await self._redis.incr(key)
+        except Exception as e:
+            print(f"Redis incr error for {key}: {str(e)}")
+            return None
+
+    async def publish(self, channel: str, message: str) -> bool:
+        """Publish message on channel"""
+        try:
+            await self._redis.publish(channel, message)
+            return True
+        except Exception as e:
+            print(f"Redis publish error for {channel}: {str(e)}")
+            return False
+
+    async def delete_prefix(self, prefix: str, keep: Iterable[str] = (), batch_size: int = 500) -> int:
+        """
+        Delete every key starting with prefix except those in keep, returns the number of keys removed.
+        Walks the keyspace with SCAN and frees values with UNLINK, so Redis is never blocked for long.
+        """
+        keep = {key.encode() for key in keep}
+        deleted = 0
+        batch = []
+        try:
+            async for key in self._redis.scan_iter(match=f"{prefix}*", count=batch_size):
+                if key in keep:
+                    continue
+                batch.append(key)
+                if len(batch) >= batch_size:
+                    deleted += await self._redis.unlink(*batch)
+                    batch = []
+            if batch:
+                deleted += await self._redis.unlink(*batch)
+        except Exception as e:
+            print(f"Redis delete error for prefix {prefix}: {str(e)}")
+        return deleted
+
+    async def clear_all(self, keep: Iterable[str] = ()) -> bool:
+        """Clear every key in this app's namespace, other services sharing the Redis are left alone"""
+        deleted = await self.delete_prefix(f"{settings.CACHE_NAMESPACE}:", keep=keep)
+        print(f"Cleared {deleted} keys from cache namespace {settings.CACHE_NAMESPACE}")
+        return True
@@ -0,0 +1,62 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.cache.redis import RedisService
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent loads of the same key into one upstream call.
+
+    Callers in the same worker share one in-flight task. Across workers a short
+    Redis lock elects a single loader, the others poll the cache until the
+    loader has written its result (or the lock goes away) before loading themselves.
+    """
+
+    def __init__(self, lock_milliseconds: int = 10000, wait_seconds: float = 10.0, poll_interval_seconds: float = 0.1):
+        self.cache = RedisService()
+        self.lock_milliseconds = lock_milliseconds
+        self.wait_seconds = wait_seconds
+        self.poll_interval_seconds = poll_interval_seconds
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    async def do(self, key: str, load: Callable[[], Awaitable[Any]], load_cached: Callable[[], Awaitable[Optional[Any]]]) -> Any:
+        """
+        Run load() once per key across concurrent callers.
+        load_cached() is used by waiters to pick up the result another worker wrote.
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._run(key, load, load_cached))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shield so a cancelled caller doesn't cancel the load other callers wait on
+        return await asyncio.shield(task)
+
+    async def _run(self, key: str, load: Callable[[], Awaitable[Any]], load_cached: Callable[[], Awaitable[Optional[Any]]]) -> Any:
+        lock_key = f"{key}:lock"
+        token = await self.cache.acquire_lock(lock_key, self.lock_milliseconds)
+        if token:
+            try:
+                return await load()
+            finally:
+                await self.cache.release_lock(lock_key, token)
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.wait_seconds
+        while loop.time() < deadline:
+            await asyncio.sleep(self.poll_interval_seconds)
+            cached = await load_cached()
+            if cached is not None:
+                return cached
+            if not await self.cache.exists(lock_key):
+                break
+
+        cached = await load_cached()
+        if cached is not None:
+            return cached
+        return await load()
+
+
+# Shared by every PortfolioMetrics instance in this worker
+stock_details_flight = SingleFlight()
@@ -0,0 +1,68 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Set
+
+from app.cache.redis import RedisService, cache_stale_served_total, key_family
+from app.cache.single_flight import SingleFlight
+from app.core.metrics import metrics
+
+cache_refreshes_total = metrics.counter("cache_refreshes_total", "Background refreshes of soft-expired cache entries by result")
+
+
+class StaleWhileRevalidate:
+    """
+    Serves entries written with a soft and a hard TTL.
+
+    Before the soft expiry the cached value is returned as is. Between the soft
+    and the hard expiry it is still returned immediately, and the first caller
+    to take the `{key}:refresh` Redis lock reloads it in the background. After
+    the hard expiry callers coalesce on a single load through SingleFlight.
+    """
+
+    def __init__(self, lock_milliseconds: int = 30000):
+        self.cache = RedisService()
+        self.flight = SingleFlight()
+        self.lock_milliseconds = lock_milliseconds
+        self._refreshes: Set[asyncio.Task] = set()
+
+    async def get(self, key: str, load: Callable[[], Awaitable[Any]], soft_expire_minutes: int, expire_minutes: int) -> Any:
+        """
+        Cached value of key, loading it with load() when missing.
+        load() returns the value as stored, it must be serializable by the cache codec.
+        """
+        cached, is_stale = await self.cache.get_with_staleness(key)
+        if cached is None:
+            return await self.flight.do(
+                key=key,
+                load=lambda: self._load_and_store(key, load, soft_expire_minutes, expire_minutes),
+                load_cached=lambda: self.cache.get(key),
+            )
+
+        if is_stale:
+            cache_stale_served_total.inc(family=key_family(key), reason="soft_expired")
+            token = await self.cache.acquire_lock(f"{key}:refresh", self.lock_milliseconds)
+            if token:
+                task = asyncio.create_task(self._refresh(key, token, load, soft_expire_minutes, expire_minutes))
+                # Keep a reference so the task isn't garbage collected mid-refresh
+                self._refreshes.add(task)
+                task.add_done_callback(self._refreshes.discard)
+        return cached
+
+    async def _load_and_store(self, key: str, load: Callable[[], Awaitable[Any]], soft_expire_minutes: int, expire_minutes: int) -> Any:
+        value = await load()
+        await self.cache.set(key, value, expire_minutes=expire_minutes, soft_expire_minutes=soft_expire_minutes)
+        return value
+
+    async def _refresh(self, key: str, token: str, load: Callable[[], Awaitable[Any]], soft_expire_minutes: int, expire_minutes: int) -> None:
+        try:
+            await self._load_and_store(key, load, soft_expire_minutes, expire_minutes)
+            cache_refreshes_total.inc(family=key_family(key), result="ok")
+        except Exception as e:
+            # The stale value stays in place until the hard TTL, the next caller after the lock expires retries
+            print(f"Background refresh error for {key}: {str(e)}")
+            cache_refreshes_total.inc(family=key_family(key), result="error")
+            return
+        await self.cache.release_lock(f"{key}:refresh", token)
+
+
+# Shared by every HelperFunctions instance in this worker
+stale_while_revalidate = StaleWhileRevalidate()
@@ -13,6 +13,65 @@ class Settings(BaseSettings):
     REDIS_PORT: int
     REDIS_USERNAME: str
     REDIS_PASSWORD: str
+    REDIS_MAX_CONNECTIONS: int = 50
+    REDIS_POOL_TIMEOUT_SECONDS: float = 2.0
+    REDIS_SOCKET_TIMEOUT_SECONDS: float = 2.0
+    REDIS_SOCKET_CONNECT_TIMEOUT_SECONDS: float = 2.0
+    REDIS_HEALTH_CHECK_INTERVAL_SECONDS: int = 30
+    ISM_API_HTTP2: bool = True
+    ISM_API_MAX_CONNECTIONS: int = 50
+    ISM_API_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    ISM_API_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    ISM_API_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    ISM_API_READ_TIMEOUT_SECONDS: float = 10.0
+    ISM_API_POOL_TIMEOUT_SECONDS: float = 5.0
+    ISM_API_RATE_LIMIT_PER_SECOND: float = 5.0
+    ISM_API_RATE_LIMIT_BURST: int = 10
+    ISM_API_RATE_LIMIT_INTERACTIVE_RESERVE: int = 4
+    ISM_API_RATE_LIMIT_INTERACTIVE_MAX_WAIT_SECONDS: float = 10.0
+    ISM_API_RATE_LIMIT_BACKGROUND_MAX_WAIT_SECONDS: float = 60.0
+    ISM_API_CIRCUIT_FAILURE_THRESHOLD: int = 5
+    ISM_API_CIRCUIT_RECOVERY_SECONDS: float = 30.0
+    STOCK_QUOTE_TTL_MINUTES: int = 5
+    STOCK_QUOTE_STALE_TTL_MINUTES: int = 1440
+    STOCK_FUNDAMENTALS_TTL_MINUTES: int = 720
+    STOCK_QUOTE_FETCH_ATTEMPTS: int = 3
+    STOCK_QUOTE_RETRY_BASE_DELAY_SECONDS: float = 0.25
+    STOCK_QUOTE_RETRY_MAX_DELAY_SECONDS: float = 2.0
+    STOCK_QUOTE_INTERACTIVE_DEADLINE_SECONDS: float = 8.0
+    STOCK_QUOTE_BACKGROUND_DEADLINE_SECONDS: float = 90.0
+    NEWS_ARTICLES_TTL_MINUTES: int = 180
+    NEWS_ARTICLES_STALE_TTL_MINUTES: int = 360
+    TRENDING_STOCKS_TTL_MINUTES: int = 120
+    TRENDING_STOCKS_STALE_TTL_MINUTES: int = 240
+    CACHE_NAMESPACE: str = "alps"
+    CACHE_SERIALIZER: str = "orjson"
+    CACHE_COMPRESSION: str = "zstd"
+    CACHE_COMPRESSION_MIN_BYTES: int = 1024
+    L1_CACHE_MAX_ENTRIES: int = 5000
+    L1_CACHE_TTL_SECONDS: float = 15.0
+    PRICE_WARMER_ENABLED: bool = True
+    PRICE_WARMER_MARKET_INTERVAL_SECONDS: int = 60
+    PRICE_WARMER_OFF_HOURS_INTERVAL_SECONDS: int = 1800
+    PRICE_WARMER_CONCURRENCY: int = 5
+    RISK_HISTORY_PERIOD: str = "1yr"
+    RISK_MIN_OBSERVATIONS: int = 60
+    PRICE_HISTORY_TTL_MINUTES: int = 720
+    COVARIANCE_TTL_MINUTES: int = 1440
+    RISK_MODEL_REQUEST_DEADLINE_SECONDS: float = 2.0
+    RISK_MODEL_LOAD_LOCK_SECONDS: int = 300
+    PRICE_STORE_LOOKBACK_DAYS: int = 365
+    VAR_PATHS: int = 20000
+    VAR_HORIZON_DAYS: int = 1
+    VAR_SEED: int = 42
+    VAR_PROCESS_POOL_MIN_DRAWS: int = 2000000
+    VAR_PROCESS_POOL_WORKERS: int = 2
+    PRICE_STORE_MAX_AGE_DAYS: int = 4
+    BATCH_VALUATION_USERS_PER_CHUNK: int = 1000
+    BATCH_VALUATION_SYMBOLS_PER_CHUNK: int = 200
+    BATCH_VALUATION_TTL_MINUTES: int = 1440
+    PORTFOLIO_HISTORY_PAGE_SIZE: int = 100
+    PORTFOLIO_HISTORY_MAX_PAGE_SIZE: int = 1000
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,25 @@
+from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
+
+class HistoricalDataset(BaseModel):
+    metric: str
+    label: Optional[str] = None
+    # [date, value] pairs, Volume rows carry a third element with delivery data
+    values: List[List[Any]]
+    meta: Optional[Dict[str, Any]] = None
+
+class ISMHistoricalDataResponse(BaseModel):
+    datasets: List[HistoricalDataset]
+
+    def prices(self) -> Dict[str, float]:
+        """Closing price per ISO date from the Price dataset"""
+        for dataset in self.datasets:
+            if dataset.metric == "Price":
+                return {str(row[0]): float(row[1]) for row in dataset.values if len(row) >= 2 and row[1] is not None}
+        return {}
+
+class PriceHistory(BaseModel):
+    """Daily closes of one symbol as cached for the risk model, dates ascending"""
+    symbol: str
+    dates: List[str]
+    prices: List[float]
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import ClassVar, Dict, Optional, List
 
 
 class OfficerTitle(BaseModel):
@@ -89,6 +89,15 @@ class KeyMetricItem(BaseModel):
     key: str
     value: Optional[str]
 
+def parse_metric_value(value: Optional[str]) -> Optional[float]:
+    """Upstream metric strings as floats, None when missing or not a number"""
+    if value is None:
+        return None
+    try:
+        return float(value.replace(",", ""))
+    except ValueError:
+        return None
+
 class KeyMetrics(BaseModel):
     mgmt_effectiveness: List[KeyMetricItem] = Field(alias="mgmtEffectiveness")
     margins: List[KeyMetricItem]
@@ -99,6 +108,14 @@ class KeyMetrics(BaseModel):
     per_share_data: List[KeyMetricItem] = Field(alias="persharedata")
     price_and_volume: List[KeyMetricItem] = Field(alias="priceandVolume")
 
+    def index(self) -> Dict[str, Optional[float]]:
+        """Every metric of every group by key, values parsed once"""
+        groups = (
+            self.mgmt_effectiveness, self.margins, self.financial_strength, self.valuation,
+            self.income_statement, self.growth, self.per_share_data, self.price_and_volume,
+        )
+        return {metric.key: parse_metric_value(metric.value) for group in groups for metric in group}
+
 class AnalystRating(BaseModel):
     color_code: str = Field(alias="colorCode")
     rating_name: str = Field(alias="ratingName")
@@ -307,4 +324,65 @@ class ISMTrendingStocksResponse(BaseModel):
 
     class Config:
         from_attributes = True
-        populate_by_name = True
\ No newline at end of file
+        populate_by_name = True
+
+class StockKeyMetrics(BaseModel):
+    """Key metrics of a stock normalized at ingestion into {key: float or None}, so lookups never scan or parse"""
+    BETA: ClassVar[str] = "beta"
+
+    values: Dict[str, Optional[float]] = Field(default_factory=dict)
+
+    @classmethod
+    def from_stock_details(cls, stock_details: ISMStockDetailsResponse) -> "StockKeyMetrics":
+        return cls(values=stock_details.key_metrics.index() if stock_details.key_metrics else {})
+
+    @property
+    def beta(self) -> Optional[float]:
+        return self.values.get(self.BETA)
+
+class StockQuote(BaseModel):
+    """
+    Slim projection of ISMStockDetailsResponse, cached on a short TTL.
+    Holds everything valuation and risk need so the hot path never parses
+    the full payload; everything else is cached as the stock fundamentals.
+    """
+    company_name: str = Field(alias="companyName")
+    industry: Optional[str] = None
+    current_price: CurrentPrice = Field(alias="currentPrice")
+    previous_close: Optional[str] = Field(None, alias="previousClose")
+    percent_change: Optional[str] = Field(None, alias="percentChange")
+    year_high: Optional[str] = Field(None, alias="yearHigh")
+    year_low: Optional[str] = Field(None, alias="yearLow")
+    date: Optional[str] = None
+    time: Optional[str] = None
+    beta: Optional[float] = None
+    risk_meter: Optional[RiskMeter] = Field(None, alias="riskMeter")
+
+    class Config:
+        from_attributes = True
+        populate_by_name = True
+
+    @classmethod
+    def from_stock_details(cls, stock_details: ISMStockDetailsResponse) -> "StockQuote":
+        reusable_data = stock_details.stock_details_reusable_data
+        key_metrics = StockKeyMetrics.from_stock_details(stock_details)
+        return cls(
+            company_name=stock_details.company_name,
+            industry=stock_details.industry,
+            current_price=stock_details.current_price,
+            previous_close=reusable_data.close,
+            percent_change=stock_details.percent_change,
+            year_high=stock_details.year_high,
+            year_low=stock_details.year_low,
+            date=reusable_data.date,
+            time=reusable_data.time,
+            beta=key_metrics.beta,
+            risk_meter=stock_details.risk_meter,
+        )
+
+class StockRecentNews(BaseModel):
+    """Projection of ISMStockDetailsResponse that only validates the recent news"""
+    recent_news: Optional[List[RecentNews]] = Field(default_factory=list, alias="recentNews")
+
+    class Config:
+        populate_by_name = True
@@ -0,0 +1,31 @@
+import datetime
+import enum
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel
+
+
+class HistoryInterval(str, enum.Enum):
+    DAILY = "daily"
+    WEEKLY = "weekly"
+    MONTHLY = "monthly"
+
+
+class PortfolioSnapshotOut(BaseModel):
+    # Start of the day, ISO week or month the point stands for; as_of is the snapshot closing it
+    period_start: datetime.date
+    as_of: datetime.date
+    total_invested: float
+    total_current_value: float
+    total_pnl: float
+    sector_weights: Dict[str, float]
+
+    class Config:
+        from_attributes = True
+
+
+class PortfolioHistoryResponse(BaseModel):
+    interval: HistoryInterval
+    snapshots: List[PortfolioSnapshotOut]
+    # Pass as `after` to fetch the next page, None on the last page
+    next_cursor: Optional[datetime.date] = None
@@ -1,5 +1,7 @@
-from dataclasses import dataclass
-from typing import List
+import datetime
+import enum
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
 
 from pydantic import BaseModel
 
@@ -17,6 +19,7 @@ class HoldingMetrics:
     days_pnl: float
     weightage: float
     industry: str
+    is_stale: bool = False
 
 @dataclass
 class SectorAllocation:
@@ -32,6 +35,24 @@ class PortfolioSummary:
     total_pnl: float
     total_return_pct: float
     sector_allocations: List[SectorAllocation]
+    # Valued from the last known good quote
+    stale_symbols: List[str] = field(default_factory=list)
+    # Held but left out of the valuation, no quote could be fetched before the deadline
+    unavailable_symbols: List[str] = field(default_factory=list)
+
+@dataclass
+class PortfolioStreamSummary:
+    """Last event of a streamed valuation, streamed holding rows carry no weightage"""
+    portfolio_summary: PortfolioSummary
+    # Weightage in percent per symbol
+    weights: Dict[str, float]
+
+@dataclass
+class PortfolioValuation:
+    user_id: int
+    holding_metrics: List[HoldingMetrics]
+    portfolio_summary: PortfolioSummary
+    valued_at: datetime.datetime
 
 @dataclass
 class StockRiskMetrics:
@@ -42,15 +63,49 @@ class StockRiskMetrics:
     risk_meter: str
     standard_deviation: float
 
+class ValueAtRisk(BaseModel):
+    """Monte Carlo losses over horizon_days in percent of current value, positive numbers are losses"""
+    horizon_days: int
+    paths: int
+    seed: int
+    as_of: str
+    var_95: float
+    var_99: float
+    expected_shortfall_95: float
+    expected_shortfall_99: float
+
 @dataclass
 class PortfolioRiskMetrics:
     beta: float
     total_pnl: float
     sector_allocations: List[SectorAllocation]
-    standard_deviation: float
+    # Annualized volatility of daily returns in percent, sqrt(w'Σw); None while price histories are still loading
+    standard_deviation: Optional[float]
     top_3_holdings_weightage: float
     herfindahl_index: float
     sector_concentration: float
+    # None while price histories are still loading
+    value_at_risk: Optional[ValueAtRisk] = None
+
+@dataclass
+class ConcentrationMetrics:
+    top_3_holdings_weightage: float
+    herfindahl_index: float
+    sector_concentration: float
+
+class DashboardSection(str, enum.Enum):
+    HOLDINGS = "holdings"
+    SUMMARY = "summary"
+    RISK = "risk"
+    CONCENTRATION = "concentration"
+
+class CovarianceEstimate(BaseModel):
+    """Annualized, shrunk covariance of daily log returns; rows and columns follow symbols"""
+    symbols: List[str]
+    as_of: str
+    observations: int
+    shrinkage: float
+    matrix: List[List[float]]
 
 class PortfolioMetricsResponse(BaseModel):
     holding_metrics: List[HoldingMetrics]
@@ -64,4 +119,15 @@ class PortfolioRiskMetricsResponse(BaseModel):
     portfolio_risk_metrics: PortfolioRiskMetrics
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class PortfolioDashboardResponse(BaseModel):
+    # Sections that were not requested are left out of the response
+    holding_metrics: Optional[List[HoldingMetrics]] = None
+    portfolio_summary: Optional[PortfolioSummary] = None
+    stocks_risk_metrics: Optional[List[StockRiskMetrics]] = None
+    portfolio_risk_metrics: Optional[PortfolioRiskMetrics] = None
+    concentration: Optional[ConcentrationMetrics] = None
+
+    class Config:
+        from_attributes = True
@@ -6,7 +6,7 @@ class Holding(Base):
     __tablename__ = "holdings"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     symbol = Column(String, index=True, nullable=False)
     name = Column(String, nullable=False)
     isin_number = Column(String, nullable=True)
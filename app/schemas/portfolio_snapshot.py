@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Date, DateTime, Float, ForeignKey, Integer, func
+from sqlalchemy.dialects.postgresql import JSONB
+from app.db.base import Base
+
+class PortfolioSnapshot(Base):
+    __tablename__ = "portfolio_snapshots"
+
+    # Primary key doubles as the (user_id, as_of) index history reads scan
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    as_of = Column(Date, primary_key=True)    # IST trading date
+    total_invested = Column(Float, nullable=False)
+    total_current_value = Column(Float, nullable=False)
+    total_pnl = Column(Float, nullable=False)
+    sector_weights = Column(JSONB, nullable=False, server_default="{}")    # sector -> % of current value
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
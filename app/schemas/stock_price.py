@@ -0,0 +1,12 @@
+from sqlalchemy import Column, Float, String, DateTime, func
+from app.db.base import Base
+
+class StockPrice(Base):
+    __tablename__ = "stock_prices"
+
+    # Primary key doubles as the (symbol, interval, ts) index range reads scan
+    symbol = Column(String, primary_key=True)
+    interval = Column(String, primary_key=True)    # 1d or intraday
+    ts = Column(DateTime(timezone=True), primary_key=True)
+    close = Column(Float, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
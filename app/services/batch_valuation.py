@@ -0,0 +1,166 @@
+import asyncio
+import dataclasses
+from abc import ABC, abstractmethod
+import datetime
+from dataclasses import dataclass, field
+from itertools import groupby
+from typing import Dict, List, Set, Tuple
+
+from app.cache.keys import cache_keys
+from app.cache.redis import RedisService, close_redis, init_redis
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.ism_api.stock import StockQuote
+from app.models.portfolio_metrics import PortfolioValuation
+from app.schemas.holding import Holding
+from app.services.ism_api import ISMApi, ism_api
+from app.services.portfolio_metrics import PortfolioMetrics
+from app.services.rate_limiter import Priority
+from app.services.valuation_engine import value_portfolios
+
+
+class ValuationSink(ABC):
+    """Destination for batch valuation results, written one chunk of users at a time"""
+
+    @abstractmethod
+    async def write(self, valuations: List[PortfolioValuation]) -> None:
+        ...
+
+
+class RedisValuationSink(ValuationSink):
+    """Latest valuation per user under `portfolio_valuation:{user_id}`, one pipelined write per chunk"""
+
+    def __init__(self, expire_minutes: int = settings.BATCH_VALUATION_TTL_MINUTES):
+        self.cache = RedisService()
+        self.expire_minutes = expire_minutes
+
+    async def write(self, valuations: List[PortfolioValuation]) -> None:
+        items = {
+            cache_keys.key("portfolio_valuation", str(valuation.user_id)): {
+                "holding_metrics": [dataclasses.asdict(metrics) for metrics in valuation.holding_metrics],
+                "portfolio_summary": dataclasses.asdict(valuation.portfolio_summary),
+            }
+            for valuation in valuations
+        }
+        if not await self.cache.set_many(items, expire_minutes=self.expire_minutes):
+            raise RuntimeError(f"Failed to write {len(items)} portfolio valuations")
+
+
+@dataclass
+class BatchValuationResult:
+    users: int = 0
+    holdings: int = 0
+    stale_symbols: Set[str] = field(default_factory=set)
+    missing_symbols: Set[str] = field(default_factory=set)
+
+
+class BatchPortfolioValuation:
+    """
+    Values every user's portfolio in one pass.
+
+    Quotes for each distinct held symbol are loaded once up front, through the
+    same cache and upstream path as per-request valuation. Holdings are then
+    read from Postgres in chunks of whole users, keyset-paginated on user_id,
+    valued together with value_portfolios and handed to the sink, so memory is
+    bounded by the chunk size rather than the number of users.
+    """
+
+    def __init__(self, ism_api: ISMApi, sink: ValuationSink,
+                 users_per_chunk: int = settings.BATCH_VALUATION_USERS_PER_CHUNK,
+                 symbols_per_chunk: int = settings.BATCH_VALUATION_SYMBOLS_PER_CHUNK):
+        self.portfolio_metrics = PortfolioMetrics(ism_api)
+        self.sink = sink
+        self.users_per_chunk = users_per_chunk
+        self.symbols_per_chunk = symbols_per_chunk
+
+    async def run(self) -> BatchValuationResult:
+        try:
+            result = BatchValuationResult()
+            stock_quote_map, stale_symbols = await self._load_stock_quotes()
+            result.stale_symbols = stale_symbols
+            valued_at = datetime.datetime.now(datetime.timezone.utc)
+
+            after_user_id = 0
+            while True:
+                rows = await asyncio.to_thread(self._load_user_chunk, after_user_id, self.users_per_chunk)
+                if not rows:
+                    break
+                after_user_id = rows[-1].user_id
+
+                portfolios = [(user_id, list(user_rows)) for user_id, user_rows in groupby(rows, key=lambda row: row.user_id)]
+                valuations = value_portfolios([holdings for _, holdings in portfolios], stock_quote_map, stale_symbols)
+                await self.sink.write([
+                    PortfolioValuation(user_id=user_id, holding_metrics=holding_metrics, portfolio_summary=portfolio_summary, valued_at=valued_at)
+                    for (user_id, _), (holding_metrics, portfolio_summary) in zip(portfolios, valuations)
+                ])
+
+                result.users += len(portfolios)
+                result.holdings += len(rows)
+                result.missing_symbols.update(row.symbol for row in rows if row.symbol not in stock_quote_map)
+
+            print(f"Batch valuation wrote {result.users} portfolios ({result.holdings} holdings, "
+                  f"{len(result.stale_symbols)} stale and {len(result.missing_symbols)} missing symbols)")
+            return result
+        except Exception as e:
+            raise RuntimeError(f"Error running batch valuation: {str(e)}")
+
+    async def _load_stock_quotes(self) -> Tuple[Dict[str, StockQuote], Set[str]]:
+        stock_symbols_isin = await asyncio.to_thread(self._load_held_symbols)
+        symbols = list(stock_symbols_isin)
+        stock_quote_map: Dict[str, StockQuote] = {}
+        stale_symbols: Set[str] = set()
+        # Chunked so one MGET and one burst of upstream fetches stay bounded
+        for start in range(0, len(symbols), self.symbols_per_chunk):
+            chunk_quotes, chunk_stale = await self.portfolio_metrics.get_stock_quotes(
+                symbols[start:start + self.symbols_per_chunk], stock_symbols_isin, priority=Priority.BACKGROUND
+            )
+            stock_quote_map.update(chunk_quotes)
+            stale_symbols.update(chunk_stale)
+        return stock_quote_map, stale_symbols
+
+    @staticmethod
+    def _load_held_symbols() -> Dict[str, str]:
+        db = SessionLocal()
+        try:
+            # Quotes are fetched by ISIN, holdings without one can't be priced
+            rows = db.query(Holding.symbol, Holding.isin_number).filter(Holding.isin_number.isnot(None)).distinct().all()
+            return {symbol: isin_number for symbol, isin_number in rows}
+        finally:
+            db.close()
+
+    @staticmethod
+    def _load_user_chunk(after_user_id: int, users_per_chunk: int) -> list:
+        """Holdings of the next users_per_chunk users after after_user_id, ordered by user"""
+        db = SessionLocal()
+        try:
+            last_user_id = (
+                db.query(Holding.user_id)
+                .filter(Holding.user_id > after_user_id)
+                .distinct()
+                .order_by(Holding.user_id)
+                .offset(users_per_chunk - 1)
+                .limit(1)
+                .scalar()
+            )
+            query = db.query(Holding.user_id, Holding.symbol, Holding.name, Holding.shares, Holding.avg_cost).filter(Holding.user_id > after_user_id)
+            if last_user_id is not None:
+                query = query.filter(Holding.user_id <= last_user_id)
+            return query.order_by(Holding.user_id, Holding.id).all()
+        finally:
+            db.close()
+
+
+async def main() -> None:
+    """Entry point for scheduled runs: python -m app.services.batch_valuation"""
+    await init_redis()
+    await cache_keys.load_generation()
+    await ism_api.start()
+    try:
+        await BatchPortfolioValuation(ism_api, RedisValuationSink()).run()
+    finally:
+        await ism_api.close()
+        await close_redis()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,82 @@
+import enum
+import time
+
+from app.core.metrics import metrics
+
+circuit_state_changes_total = metrics.counter("circuit_breaker_state_changes_total", "Circuit breaker state transitions")
+circuit_rejections_total = metrics.counter("circuit_breaker_rejections_total", "Calls rejected while the circuit was open")
+
+
+class CircuitState(str, enum.Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class CircuitBreaker:
+    """
+    Per-process circuit breaker.
+
+    Opens after `failure_threshold` consecutive failures and rejects calls for
+    `recovery_timeout_seconds`. After that a single trial call is let through,
+    its outcome closes the circuit again or re-opens it for another timeout.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, recovery_timeout_seconds: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout_seconds = recovery_timeout_seconds
+        self._state = CircuitState.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._trial_started_at = 0.0
+
+    @property
+    def state(self) -> CircuitState:
+        if self._state == CircuitState.OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout_seconds:
+            return CircuitState.HALF_OPEN
+        return self._state
+
+    @property
+    def is_open(self) -> bool:
+        return self.state == CircuitState.OPEN
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError if the call should not reach the upstream"""
+        state = self.state
+        if state == CircuitState.CLOSED:
+            return
+        # A trial that never reported back (e.g. cancelled) must not wedge the circuit
+        trial_expired = time.monotonic() - self._trial_started_at >= self.recovery_timeout_seconds
+        if state == CircuitState.HALF_OPEN and (not self._trial_in_flight or trial_expired):
+            self._trial_in_flight = True
+            self._trial_started_at = time.monotonic()
+            self._transition(CircuitState.HALF_OPEN)
+            return
+        circuit_rejections_total.inc(circuit=self.name)
+        raise CircuitOpenError(f"Circuit {self.name} is open, failing fast")
+
+    def record_success(self) -> None:
+        self._consecutive_failures = 0
+        self._trial_in_flight = False
+        if self._state != CircuitState.CLOSED:
+            self._transition(CircuitState.CLOSED)
+
+    def record_failure(self) -> None:
+        self._consecutive_failures += 1
+        trial_failed = self._trial_in_flight
+        self._trial_in_flight = False
+        if trial_failed or self._consecutive_failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+            self._transition(CircuitState.OPEN)
+
+    def _transition(self, state: CircuitState) -> None:
+        if self._state != state:
+            print(f"Circuit {self.name} {self._state.value} -> {state.value}")
+            circuit_state_changes_total.inc(circuit=self.name, state=state.value)
+        self._state = state
@@ -1,37 +1,40 @@
-import asyncio
 import json
-from typing import List
+from typing import Dict, List, Optional
 from sqlalchemy.orm import Session
+from app.cache.keys import cache_keys
 
 from app.schemas.holding import Holding
 from app.services.investment_preferences import InvestmentPreferences
 from app.services.ism_api import ISMApi
 from app.services.openai_api import OpenAIAPI
+from app.services.portfolio_context import PortfolioContext
 from app.services.portfolio_metrics import PortfolioMetrics
 from app.utils.helper_functions import HelperFunctions
 
 
 class InvestmentAdvice:
-    def __init__(self, db: Session, ism_api: ISMApi, openai_api: OpenAIAPI = None):
+    def __init__(self, db: Session, ism_api: ISMApi, openai_api: OpenAIAPI = None, context: Optional[PortfolioContext] = None):
         self.db = db
         self.ism_api = ism_api
         self.openai_api = openai_api
-        self.portfolio_metrics = PortfolioMetrics(ism_api, openai_api)
+        self.portfolio_metrics = PortfolioMetrics(ism_api, openai_api, context=context)
         self.helper_functions = HelperFunctions(ism_api)
         self.investment_preferences = InvestmentPreferences(db)
 
-    async def _fetch_news_for_holding(self, holding: Holding) -> tuple[str, List[dict]]:
-        stock_news = await self.helper_functions.get_cached_stock_specific_news(symbol=holding.symbol, isin_number=holding.isin_number)
-        if stock_news:
-            return holding.symbol, [
+    async def _fetch_news_for_holdings(self, holdings: List[Holding]) -> Dict[str, List[dict]]:
+        symbols_isin = list({holding.symbol: holding.isin_number for holding in holdings}.items())
+        stock_news_map = await self.helper_functions.get_cached_stock_specific_news(symbols_isin)
+        return {
+            symbol: [
                 {
                     "headline": news.headline,
                     "intro": news.intro,
                     "date": news.date
                 }
-                for news in stock_news
+                for news in stock_news_map.get(symbol, [])
             ]
-        return holding.symbol, []
+            for symbol, _ in symbols_isin
+        }
 
     async def generate_comprehensive_advisory_genai(self, holdings: List[Holding], user_id: int) -> str:
         """
@@ -42,7 +45,7 @@ class InvestmentAdvice:
                 return "No holdings to analyze."
             
             if user_id:
-                cache_key = f"comprehensive_advisory_genai:{user_id}"
+                cache_key = cache_keys.key("comprehensive_advisory_genai", str(user_id))
                 cached_advisory = await self.helper_functions.get_cached_data(key=cache_key)
                 if cached_advisory:
                     return cached_advisory
@@ -61,9 +64,7 @@ class InvestmentAdvice:
                     "pub_date": pub_date
                 })
 
-            news_tasks = [self._fetch_news_for_holding(holding) for holding in holdings]
-            news_results = await asyncio.gather(*news_tasks)
-            stock_specific_news_summaries = dict(news_results)
+            stock_specific_news_summaries = await self._fetch_news_for_holdings(holdings)
 
             trending_stocks = await self.helper_functions.get_cached_trending_stocks()
             top_gainers, top_losers = [], []
@@ -1,62 +1,127 @@
+import importlib.util
+from typing import Any, Optional
+
 from app.core.config import settings
+from app.models.ism_api.historical import ISMHistoricalDataResponse
 from app.models.ism_api.news import ISMNewsArticle
 from app.models.ism_api.stock import ISMStockDetailsResponse, ISMTrendingStocksResponse
+from app.services.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.services.rate_limiter import Priority, TokenBucketRateLimiter, ism_rate_limiter
 import httpx
 
 class ISMApi:
     INDIAN_STOCK_MARKET_API_BASE_URL = "https://stock.indianapi.in"
 
-    @staticmethod
-    async def get_stock_details(isin_number: str) -> ISMStockDetailsResponse:
+    def __init__(self, rate_limiter: TokenBucketRateLimiter = ism_rate_limiter):
+        self._client: Optional[httpx.AsyncClient] = None
+        self.rate_limiter = rate_limiter
+        self.circuit_breaker = CircuitBreaker(
+            name="ism_api",
+            failure_threshold=settings.ISM_API_CIRCUIT_FAILURE_THRESHOLD,
+            recovery_timeout_seconds=settings.ISM_API_CIRCUIT_RECOVERY_SECONDS,
+        )
+
+    async def start(self) -> None:
+        """Open the shared keep-alive connection pool"""
+        if self._client is not None:
+            return
+
+        # HTTP/2 needs the optional `h2` package, fall back to HTTP/1.1 keep-alive without it
+        http2 = settings.ISM_API_HTTP2 and importlib.util.find_spec("h2") is not None
+
+        self._client = httpx.AsyncClient(
+            base_url=ISMApi.INDIAN_STOCK_MARKET_API_BASE_URL,
+            headers={
+                "x-api-key": settings.INDIAN_STOCK_MARKET_API_KEY
+            },
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=settings.ISM_API_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.ISM_API_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.ISM_API_KEEPALIVE_EXPIRY_SECONDS,
+            ),
+            timeout=httpx.Timeout(
+                settings.ISM_API_READ_TIMEOUT_SECONDS,
+                connect=settings.ISM_API_CONNECT_TIMEOUT_SECONDS,
+                pool=settings.ISM_API_POOL_TIMEOUT_SECONDS,
+            ),
+        )
+
+    async def close(self) -> None:
+        """Close the shared connection pool"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            raise RuntimeError("ISMApi client is not started")
+        return self._client
+
+    async def _get(self, path: str, params: Optional[dict] = None, priority: Priority = Priority.INTERACTIVE) -> Any:
+        self.circuit_breaker.before_call()
+        await self.rate_limiter.acquire(priority)
+        try:
+            response = await self.client.get(path, params=params)
+            response.raise_for_status()
+        except httpx.HTTPStatusError as e:
+            # 4xx other than 429 means the upstream is healthy and the request was bad
+            if e.response.status_code >= 500 or e.response.status_code == 429:
+                self.circuit_breaker.record_failure()
+            else:
+                self.circuit_breaker.record_success()
+            raise
+        except httpx.TransportError:
+            self.circuit_breaker.record_failure()
+            raise
+        self.circuit_breaker.record_success()
+        return response.json()
+
+    async def get_stock_details(self, isin_number: str, priority: Priority = Priority.INTERACTIVE) -> ISMStockDetailsResponse:
         try:
-            async with httpx.AsyncClient(timeout=10) as client:
-                response = await client.get(
-                    f"{ISMApi.INDIAN_STOCK_MARKET_API_BASE_URL}/stock",
-                    headers={
-                        "x-api-key": settings.INDIAN_STOCK_MARKET_API_KEY
-                    },
-                    params={
-                        "name": isin_number
-                    }
-                )
-                response.raise_for_status()
-                return ISMStockDetailsResponse(**response.json())
+            data = await self._get("/stock", params={"name": isin_number}, priority=priority)
+            return ISMStockDetailsResponse(**data)
+        except CircuitOpenError:
+            raise
         except httpx.HTTPError as e:
             raise Exception(f"HTTP error occurred: {str(e)}")
         except Exception as e:
             raise Exception(f"Error fetching stock details: {str(e)}")
-        
-    @staticmethod
-    async def get_news() -> list[ISMNewsArticle]:
+
+    async def get_news(self, priority: Priority = Priority.INTERACTIVE) -> list[ISMNewsArticle]:
         try:
-            async with httpx.AsyncClient(timeout=10) as client:
-                response = await client.get(
-                    f"{ISMApi.INDIAN_STOCK_MARKET_API_BASE_URL}/news",
-                    headers={
-                        "x-api-key": settings.INDIAN_STOCK_MARKET_API_KEY
-                    },
-                )
-                response.raise_for_status()
-                return [ISMNewsArticle(**item) for item in response.json()]
+            data = await self._get("/news", priority=priority)
+            return [ISMNewsArticle(**item) for item in data]
+        except CircuitOpenError:
+            raise
         except httpx.HTTPError as e:
             raise Exception(f"HTTP error occurred: {str(e)}")
         except Exception as e:
             raise Exception(f"Error fetching news details: {str(e)}")
 
-    @staticmethod
-    async def get_trending_stocks() -> ISMTrendingStocksResponse:
+    async def get_trending_stocks(self, priority: Priority = Priority.INTERACTIVE) -> ISMTrendingStocksResponse:
         try:
-            async with httpx.AsyncClient(timeout=10) as client:
-                response = await client.get(
-                    f"{ISMApi.INDIAN_STOCK_MARKET_API_BASE_URL}/trending",
-                    headers={
-                        "x-api-key": settings.INDIAN_STOCK_MARKET_API_KEY
-                    },
-                )
-                response.raise_for_status()
-                return ISMTrendingStocksResponse(**response.json())
+            data = await self._get("/trending", priority=priority)
+            return ISMTrendingStocksResponse(**data)
+        except CircuitOpenError:
+            raise
         except httpx.HTTPError as e:
             raise Exception(f"HTTP error occurred: {str(e)}")
         except Exception as e:
             raise Exception(f"Error fetching trending stocks: {str(e)}")
-        
\ No newline at end of file
+
+    async def get_historical_prices(self, stock_name: str, period: str = "1yr", priority: Priority = Priority.INTERACTIVE) -> ISMHistoricalDataResponse:
+        try:
+            data = await self._get("/historical_data", params={"stock_name": stock_name, "period": period, "filter": "price"}, priority=priority)
+            return ISMHistoricalDataResponse(**data)
+        except CircuitOpenError:
+            raise
+        except httpx.HTTPError as e:
+            raise Exception(f"HTTP error occurred: {str(e)}")
+        except Exception as e:
+            raise Exception(f"Error fetching historical prices: {str(e)}")
+
+
+# Process-wide client, opened and closed by the application lifespan in main.py
+ism_api = ISMApi()
@@ -0,0 +1,60 @@
+import asyncio
+import hashlib
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.schemas.holding import Holding
+from app.schemas.user import User
+from app.services.ism_api import ISMApi
+
+
+def holdings_fingerprint(holdings: Sequence[Holding]) -> Tuple:
+    """Everything about holdings that valuation and risk depend on, in a stable order"""
+    return tuple(sorted((holding.symbol, holding.isin_number or "", holding.shares, holding.avg_cost) for holding in holdings))
+
+
+def holdings_digest(holdings: Sequence[Holding]) -> str:
+    """Short hash of holdings_fingerprint, for cache keys"""
+    return hashlib.sha256(repr(holdings_fingerprint(holdings)).encode()).hexdigest()[:16]
+
+
+class PortfolioContext:
+    """
+    What one request knows about the current user's portfolio, computed at most once.
+
+    Built by the get_portfolio_context dependency, which FastAPI resolves once
+    per request, so every service handed the context shares its holdings and
+    memoized results. Results are keyed by what they were computed from, so a
+    service asked about other holdings computes afresh.
+    """
+
+    def __init__(self, db: Session, user: User, ism_api: ISMApi):
+        self.db = db
+        self.user = user
+        self.ism_api = ism_api
+        self._holdings: Optional[List[Holding]] = None
+        self._results: Dict[Hashable, asyncio.Future] = {}
+
+    @property
+    def holdings(self) -> List[Holding]:
+        if self._holdings is None:
+            self._holdings = self.db.query(Holding).filter(Holding.user_id == self.user.id).all()
+        return self._holdings
+
+    async def memoize(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Result of compute for key, computed once; concurrent callers await the same computation.
+        Failures are not remembered, the next caller computes again.
+        """
+        future = self._results.get(key)
+        if future is None:
+            future = asyncio.ensure_future(compute())
+            self._results[key] = future
+        try:
+            # Shielded so one caller giving up doesn't cancel the computation for the others
+            return await asyncio.shield(future)
+        except Exception:
+            if self._results.get(key) is future:
+                del self._results[key]
+            raise
@@ -0,0 +1,137 @@
+import asyncio
+import datetime
+from typing import List, Optional
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import Date, cast, func, literal_column, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.cache.keys import cache_keys
+from app.cache.redis import close_redis, init_redis
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.portfolio_history import HistoryInterval, PortfolioHistoryResponse, PortfolioSnapshotOut
+from app.models.portfolio_metrics import PortfolioValuation
+from app.schemas.portfolio_snapshot import PortfolioSnapshot
+from app.services.batch_valuation import BatchPortfolioValuation, ValuationSink
+from app.services.ism_api import ism_api
+
+IST = ZoneInfo("Asia/Kolkata")
+
+# date_trunc field per downsampling interval
+TRUNCATE_TO = {
+    HistoryInterval.DAILY: "day",
+    HistoryInterval.WEEKLY: "week",
+    HistoryInterval.MONTHLY: "month",
+}
+
+
+class SnapshotValuationSink(ValuationSink):
+    """
+    One portfolio_snapshots row per user per IST trading date. Re-running the
+    job on the same day overwrites that day's rows instead of duplicating them.
+
+    Portfolios with holdings that had no quote are skipped rather than stored
+    without them, which would record a false drop in value; a rerun once the
+    quotes are available fills in their row.
+    """
+
+    async def write(self, valuations: List[PortfolioValuation]) -> None:
+        incomplete = [valuation.user_id for valuation in valuations if valuation.portfolio_summary.unavailable_symbols]
+        if incomplete:
+            print(f"Skipping snapshots of {len(incomplete)} portfolios with unavailable quotes: {incomplete}")
+        rows = [
+            {
+                "user_id": valuation.user_id,
+                "as_of": valuation.valued_at.astimezone(IST).date(),
+                "total_invested": valuation.portfolio_summary.total_invested,
+                "total_current_value": valuation.portfolio_summary.total_current_value,
+                "total_pnl": valuation.portfolio_summary.total_pnl,
+                "sector_weights": {
+                    allocation.sector: allocation.weight for allocation in valuation.portfolio_summary.sector_allocations
+                },
+            }
+            for valuation in valuations
+            if not valuation.portfolio_summary.unavailable_symbols
+        ]
+        if rows:
+            await asyncio.to_thread(self._upsert, rows)
+
+    @staticmethod
+    def _upsert(rows: List[dict]) -> None:
+        db = SessionLocal()
+        try:
+            statement = insert(PortfolioSnapshot).values(rows)
+            statement = statement.on_conflict_do_update(
+                index_elements=["user_id", "as_of"],
+                set_={
+                    "total_invested": statement.excluded.total_invested,
+                    "total_current_value": statement.excluded.total_current_value,
+                    "total_pnl": statement.excluded.total_pnl,
+                    "sector_weights": statement.excluded.sector_weights,
+                },
+            )
+            db.execute(statement)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            raise RuntimeError(f"Error writing {len(rows)} portfolio snapshots: {str(e)}")
+        finally:
+            db.close()
+
+
+def load_portfolio_history(db: Session, user_id: int, interval: HistoryInterval = HistoryInterval.DAILY,
+                           start: Optional[datetime.date] = None, end: Optional[datetime.date] = None,
+                           after: Optional[datetime.date] = None, limit: int = settings.PORTFOLIO_HISTORY_PAGE_SIZE) -> PortfolioHistoryResponse:
+    """
+    One page of a user's snapshots between start and end, oldest first.
+
+    Weekly and monthly points are the last snapshot of each period, picked in
+    SQL with DISTINCT ON over date_trunc so only one row per period leaves the
+    database. Pages are keyset-paginated on as_of: a period's point is its
+    latest as_of, so every later period starts strictly after the cursor.
+    """
+    period_start = cast(func.date_trunc(literal_column(f"'{TRUNCATE_TO[interval]}'"), PortfolioSnapshot.as_of), Date)
+    statement = select(
+        period_start.label("period_start"),
+        PortfolioSnapshot.as_of,
+        PortfolioSnapshot.total_invested,
+        PortfolioSnapshot.total_current_value,
+        PortfolioSnapshot.total_pnl,
+        PortfolioSnapshot.sector_weights,
+    ).where(PortfolioSnapshot.user_id == user_id)
+
+    if start is not None:
+        statement = statement.where(PortfolioSnapshot.as_of >= start)
+    if end is not None:
+        statement = statement.where(PortfolioSnapshot.as_of <= end)
+    if after is not None:
+        statement = statement.where(PortfolioSnapshot.as_of > after)
+
+    if interval == HistoryInterval.DAILY:
+        statement = statement.order_by(PortfolioSnapshot.as_of)
+    else:
+        statement = statement.distinct(period_start).order_by(period_start, PortfolioSnapshot.as_of.desc())
+
+    # One extra row tells whether another page follows
+    rows = db.execute(statement.limit(limit + 1)).all()
+    snapshots = [PortfolioSnapshotOut.model_validate(row) for row in rows[:limit]]
+    next_cursor = snapshots[-1].as_of if len(rows) > limit else None
+    return PortfolioHistoryResponse(interval=interval, snapshots=snapshots, next_cursor=next_cursor)
+
+
+async def main() -> None:
+    """End-of-day entry point, scheduled after the NSE close: python -m app.services.portfolio_history"""
+    await init_redis()
+    await cache_keys.load_generation()
+    await ism_api.start()
+    try:
+        await BatchPortfolioValuation(ism_api, SnapshotValuationSink()).run()
+    finally:
+        await ism_api.close()
+        await close_redis()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
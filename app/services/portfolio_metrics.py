@@ -1,83 +1,150 @@
 import asyncio
+import dataclasses
 from collections import defaultdict
 from decimal import Decimal
-from app.cache.redis import RedisService
-from app.models.ism_api.stock import ISMStockDetailsResponse
-from app.models.portfolio_metrics import HoldingMetrics, PortfolioRiskMetrics, PortfolioSummary, SectorAllocation, StockRiskMetrics
+from app.cache.keys import cache_keys
+from app.cache.redis import RedisService, cache_stale_served_total
+from app.cache.single_flight import stock_details_flight
+from app.core.config import settings
+from app.models.ism_api.stock import StockQuote
+from app.models.portfolio_metrics import (
+    ConcentrationMetrics, DashboardSection, HoldingMetrics, PortfolioDashboardResponse, PortfolioRiskMetrics, PortfolioStreamSummary,
+    PortfolioSummary, StockRiskMetrics,
+)
 from app.schemas.holding import Holding
+from app.services.circuit_breaker import CircuitState
 from app.services.ism_api import ISMApi
-from typing import Dict, List, Optional, Tuple
-from asyncio import Semaphore
+from app.services.portfolio_context import PortfolioContext, holdings_fingerprint
+from app.services.rate_limiter import Priority
+from app.services.retry import RetryPolicy, retry_until_deadline
+from app.services.risk_model import RiskModel
+from app.services.valuation_engine import value_portfolio
+from typing import AsyncIterator, Collection, Dict, List, Optional, Set, Tuple, Union
 
 from app.services.openai_api import OpenAIAPI
 from app.utils.helper_functions import HelperFunctions
 
+STOCK_QUOTE_RETRY_POLICY = RetryPolicy(
+    attempts=settings.STOCK_QUOTE_FETCH_ATTEMPTS,
+    base_delay_seconds=settings.STOCK_QUOTE_RETRY_BASE_DELAY_SECONDS,
+    max_delay_seconds=settings.STOCK_QUOTE_RETRY_MAX_DELAY_SECONDS,
+)
+# Users wait on interactive fetches, batch jobs can afford to wait out the rate limiter
+STOCK_QUOTE_DEADLINE_SECONDS = {
+    Priority.INTERACTIVE: settings.STOCK_QUOTE_INTERACTIVE_DEADLINE_SECONDS,
+    Priority.BACKGROUND: settings.STOCK_QUOTE_BACKGROUND_DEADLINE_SECONDS,
+}
+
 
 class PortfolioMetrics:
-    def __init__(self, ism_api: ISMApi, openai_api: OpenAIAPI = None):
+    def __init__(self, ism_api: ISMApi, openai_api: OpenAIAPI = None, context: Optional[PortfolioContext] = None):
         self.ism_api = ism_api
         self.openai_api = openai_api
+        # Request-scoped memo, valuation and risk metrics are computed once per request when set
+        self.context = context
         self.cache = RedisService()
         self.helper_functions = HelperFunctions(ism_api)
-        self.semaphore = Semaphore(5)  # Limit concurrent API calls
-
-    async def _fetch_single_stock(self, symbol: str, isin_number: str) -> Optional[ISMStockDetailsResponse]:
-        async with self.semaphore:  # Control concurrent API calls
-            try:
-                result = await self.ism_api.get_stock_details(isin_number)
-                cache_key = f"stock_details:{symbol}"
-                await self.cache.set(cache_key, result.model_dump(by_alias=True), expire_minutes=5)
-                await self.helper_functions.cache_stock_specific_news(result.recent_news, symbol)
-                print(f"Cached stock details for {cache_key}")
-                return result
-            except Exception as e:
-                print(f"Error fetching details for {symbol} with ISIN {isin_number}: {str(e)}")
-                return None
-
-    async def _fetch_stock_details(self, symbols: List[str], stock_symbols_isin: Dict[str, str]) -> Dict[str, ISMStockDetailsResponse]:
-        try:
-            stock_details_map = {}
-            cache_miss_symbols = []
-            retry_attempts = 3
-
-            for symbol in symbols:
-                cache_key = f"stock_details:{symbol}"
-                cached_data = await self.cache.get(cache_key)
-                if cached_data:
-                    print(f"Cache hit for {cache_key}")
-                    stock_details_map[symbol] = ISMStockDetailsResponse(**cached_data)
-                else:
-                    print(f"Cache miss for {cache_key}")
-                    cache_miss_symbols.append(symbol)
+        self.risk_model = RiskModel(ism_api)
 
-            for attempt in range(retry_attempts):
-                if not cache_miss_symbols:
-                    break
+    async def _load_stock_details(self, symbol: str, isin_number: str, priority: Priority = Priority.INTERACTIVE, quote_expire_minutes: Optional[int] = None) -> StockQuote:
+        # Upstream throughput is bounded by the shared rate limiter inside ISMApi
+        result = await self.ism_api.get_stock_details(isin_number, priority=priority)
+        return await self.helper_functions.cache_stock_details(symbol, result, quote_expire_minutes=quote_expire_minutes)
 
-                tasks = [self._fetch_single_stock(symbol=symbol, isin_number=stock_symbols_isin[symbol]) for symbol in cache_miss_symbols]
-                results = await asyncio.gather(*tasks)
+    async def _fetch_single_stock(self, symbol: str, isin_number: str, priority: Priority = Priority.INTERACTIVE, quote_expire_minutes: Optional[int] = None) -> Optional[StockQuote]:
+        try:
+            # Concurrent misses for the same ISIN share one upstream call, in this worker and across workers.
+            # Waiters in other workers pick up the short-TTL quote the loader writes; the long-lived
+            # fundamentals record says nothing about how recent the price is.
+            return await stock_details_flight.do(
+                key=cache_keys.fixed("stock_details", isin_number),
+                load=lambda: self._load_stock_details(symbol, isin_number, priority, quote_expire_minutes),
+                load_cached=lambda: self.cache.get_model(cache_keys.key("stock_quote", symbol), StockQuote),
+            )
+        except Exception as e:
+            print(f"Error fetching details for {symbol} with ISIN {isin_number}: {str(e)}")
+            return None
 
-                next_retry_symbols = []
-                for symbol, result in zip(cache_miss_symbols, results):
-                    if result:
-                        stock_details_map[symbol] = result
-                    else:
-                        next_retry_symbols.append(symbol)
+    async def refresh_stock_details(self, symbol: str, isin_number: str, priority: Priority = Priority.BACKGROUND, quote_expire_minutes: Optional[int] = None) -> Optional[StockQuote]:
+        """
+        Re-fetch and re-cache stock details ahead of expiry, used by the price warmer.
+        Returns the fresh quote, or None if the upstream could not be reached.
+        """
+        return await self._fetch_single_stock(symbol, isin_number, priority, quote_expire_minutes)
 
-                cache_miss_symbols = next_retry_symbols
+    async def _load_last_good_stock_quotes(self, symbols: List[str]) -> Dict[str, StockQuote]:
+        last_good_map = await self.helper_functions.get_cached_stock_quotes(symbols, last_good=True)
+        if last_good_map:
+            cache_stale_served_total.inc(len(last_good_map), family="stock_quote", reason="last_good")
+        return last_good_map
 
-                if cache_miss_symbols and attempt < retry_attempts - 1:
-                    print(f"Retrying fetch for symbols: {cache_miss_symbols}, attempt {attempt + 1}")
-                    await asyncio.sleep(1 * (attempt + 1))  # Exponential backoff
+    async def get_stock_quotes(self, symbols: List[str], stock_symbols_isin: Dict[str, str], priority: Priority = Priority.INTERACTIVE) -> Tuple[Dict[str, StockQuote], Set[str]]:
+        """
+        Quotes for symbols outside a per-portfolio valuation, e.g. batch jobs.
+        Same cache, upstream and last-good fallbacks as calculate_current_value_and_pnl.
+        """
+        return await self._fetch_stock_quotes(symbols, stock_symbols_isin, priority)
+
+    @staticmethod
+    def _stock_quote_deadline(priority: Priority) -> float:
+        return asyncio.get_running_loop().time() + STOCK_QUOTE_DEADLINE_SECONDS[priority]
+
+    async def _fetch_stock_quote(self, symbol: str, isin_number: str, priority: Priority, deadline: float) -> Optional[StockQuote]:
+        """One symbol's quote from the upstream under its own retry policy, None if not fetched by deadline"""
+        return await retry_until_deadline(
+            lambda: self._fetch_single_stock(symbol=symbol, isin_number=isin_number, priority=priority),
+            STOCK_QUOTE_RETRY_POLICY,
+            deadline,
+            # Upstream is failing, don't keep retrying into an open circuit
+            give_up=lambda: self.ism_api.circuit_breaker.state != CircuitState.CLOSED,
+        )
+
+    async def _fetch_stock_quotes(self, symbols: List[str], stock_symbols_isin: Dict[str, str], priority: Priority = Priority.INTERACTIVE) -> Tuple[Dict[str, StockQuote], Set[str]]:
+        """
+        Returns the quote per symbol and the set of symbols served from the
+        last known good quote because the upstream could not be reached.
+        Symbols in neither are unavailable and left out of the map.
 
-            return stock_details_map
+        Every cache miss is fetched under its own retry policy, so one slow or
+        failing symbol never holds up the others, and all of them share one
+        deadline for the whole call.
+        """
+        try:
+            # One MGET for the whole portfolio
+            stock_quote_map = await self.helper_functions.get_cached_stock_quotes(symbols)
+            cache_miss_symbols = [symbol for symbol in symbols if symbol not in stock_quote_map]
+
+            if cache_miss_symbols:
+                deadline = self._stock_quote_deadline(priority)
+                results = await asyncio.gather(*[
+                    self._fetch_stock_quote(symbol, stock_symbols_isin[symbol], priority, deadline) for symbol in cache_miss_symbols
+                ])
+                for symbol, quote in zip(cache_miss_symbols, results):
+                    if quote:
+                        stock_quote_map[symbol] = quote
+                cache_miss_symbols = [symbol for symbol in cache_miss_symbols if symbol not in stock_quote_map]
+
+            stale_map = await self._load_last_good_stock_quotes(cache_miss_symbols) if cache_miss_symbols else {}
+            stock_quote_map.update(stale_map)
+            unavailable_symbols = [symbol for symbol in cache_miss_symbols if symbol not in stale_map]
+            if unavailable_symbols:
+                print(f"No quote available for symbols: {unavailable_symbols}")
+
+            return stock_quote_map, set(stale_map)
         except Exception as e:
-            raise RuntimeError(f"Error fetching stock details: {str(e)}")
+            raise RuntimeError(f"Error fetching stock quotes: {str(e)}")
 
-    async def calculate_current_value_and_pnl(self, holdings: List[Holding]) -> tuple[List[HoldingMetrics], PortfolioSummary, Dict[str, ISMStockDetailsResponse]]:
+    async def calculate_current_value_and_pnl(self, holdings: List[Holding]) -> tuple[List[HoldingMetrics], PortfolioSummary, Dict[str, StockQuote]]:
         """
         Calculate current value and P&L for a list of holdings.
         """
+        if self.context is not None:
+            return await self.context.memoize(
+                ("current_value_and_pnl", holdings_fingerprint(holdings)), lambda: self._calculate_current_value_and_pnl(holdings)
+            )
+        return await self._calculate_current_value_and_pnl(holdings)
+
+    async def _calculate_current_value_and_pnl(self, holdings: List[Holding]) -> tuple[List[HoldingMetrics], PortfolioSummary, Dict[str, StockQuote]]:
         try:
             if not holdings:
                 return [], PortfolioSummary(
@@ -90,82 +157,67 @@ class PortfolioMetrics:
             
             symbols = list({holding.symbol for holding in holdings})
             stock_symbols_isin = {holding.symbol: holding.isin_number for holding in holdings}
-            stock_details_map = await self._fetch_stock_details(symbols, stock_symbols_isin)
+            stock_quote_map, stale_symbols = await self._fetch_stock_quotes(symbols, stock_symbols_isin)
 
-            holding_metrics_list: List[HoldingMetrics] = []
-            total_invested = Decimal('0')
-            total_current_value = Decimal('0')
-            sector_values = defaultdict(Decimal)
-            sector_holdings = defaultdict(list)
+            holding_metrics_list, portfolio_summary = value_portfolio(holdings, stock_quote_map, stale_symbols)
 
-            for holding in holdings:
-                stock_details = stock_details_map.get(holding.symbol)
-                if not stock_details:
-                    continue
+            return holding_metrics_list, portfolio_summary, stock_quote_map
+        except Exception as e:
+            raise RuntimeError(f"Error calculating current value and P&L: {str(e)}")
+        
+    async def stream_current_value_and_pnl(self, holdings: List[Holding]) -> AsyncIterator[Union[HoldingMetrics, PortfolioStreamSummary]]:
+        """
+        Holding metrics as soon as each symbol's quote resolves, then the portfolio summary.
 
-                current_price = float(stock_details.current_price.nse or stock_details.current_price.bse or 0.0)
-                prev_close = float(stock_details.stock_details_reusable_data.close or 0.0)
-                industry = stock_details.industry or "Unknown"
+        Cache hits come first, then upstream fetches in the order they complete,
+        then symbols served from the last known good quote. A row's weightage
+        needs the final total, so rows carry 0; the summary, yielded last, is
+        valued over every quote and carries the weights.
+        """
+        holdings_by_symbol: Dict[str, List[Holding]] = defaultdict(list)
+        for holding in holdings:
+            holdings_by_symbol[holding.symbol].append(holding)
+        stock_quote_map: Dict[str, StockQuote] = {}
 
-                cost_basis = Decimal(str(holding.shares * holding.avg_cost))
-                current_value = Decimal(str(holding.shares * current_price))
-                unrealized_pnl = current_value - cost_basis
-                unrealized_pnl_pct = (
-                    float((Decimal(str(current_price)) - Decimal(str(holding.avg_cost))) / Decimal(str(holding.avg_cost)) * 100)
-                    if holding.avg_cost > 0 else 0.0
-                )
-                days_pnl = holding.shares * (current_price - prev_close)
-                sector_values[industry] += current_value
-                sector_holdings[industry].append(holding.symbol)
+        def holding_rows(quotes: Dict[str, StockQuote], stale_symbols: Set[str] = frozenset()) -> List[HoldingMetrics]:
+            stock_quote_map.update(quotes)
+            symbol_holdings = [holding for symbol in quotes for holding in holdings_by_symbol[symbol]]
+            holding_metrics_list, _ = value_portfolio(symbol_holdings, quotes, stale_symbols)
+            return [dataclasses.replace(holding_metrics, weightage=0.0) for holding_metrics in holding_metrics_list]
 
-                metrics = HoldingMetrics(
-                    symbol=holding.symbol,
-                    name=holding.name,
-                    shares=holding.shares,
-                    avg_cost=holding.avg_cost,
-                    current_price=current_price,
-                    cost_basis=float(cost_basis),
-                    current_value=float(current_value),
-                    unrealized_pnl=float(unrealized_pnl),
-                    unrealized_pnl_pct=unrealized_pnl_pct,
-                    days_pnl=days_pnl,
-                    weightage=0.0,
-                    industry=industry
-                )
-                holding_metrics_list.append(metrics)
-
-                total_invested += cost_basis
-                total_current_value += current_value
-
-            total_pnl = total_current_value - total_invested
-            total_return_pct = float((total_pnl / total_invested * 100) if total_invested > 0 else Decimal('0'))
-
-            sector_allocations = []
-            for industry, value in sector_values.items():
-                sector_weight = float((value / total_current_value * 100) if total_current_value > 0 else Decimal('0'))
-                sector_allocations.append(SectorAllocation(
-                    sector=industry,
-                    current_value=float(value),
-                    weight=sector_weight,
-                    holdings=sector_holdings[industry]
-                ))
-
-            for metrics in holding_metrics_list:
-                metrics.weightage = float((Decimal(str(metrics.current_value)) / total_current_value * 100) 
-                                                  if total_current_value > 0 else Decimal('0'))
-
-            portfolio_summary = PortfolioSummary(
-                total_invested=float(total_invested),
-                total_current_value=float(total_current_value),
-                total_pnl=float(total_pnl),
-                total_return_pct=total_return_pct,
-                sector_allocations=sector_allocations
-            )
+        cached_quotes = await self.helper_functions.get_cached_stock_quotes(list(holdings_by_symbol))
+        for row in holding_rows(cached_quotes):
+            yield row
+
+        missing = [symbol for symbol in holdings_by_symbol if symbol not in cached_quotes]
+        deadline = self._stock_quote_deadline(Priority.INTERACTIVE)
+
+        async def fetch(symbol: str) -> Tuple[str, Optional[StockQuote]]:
+            return symbol, await self._fetch_stock_quote(symbol, holdings_by_symbol[symbol][0].isin_number, Priority.INTERACTIVE, deadline)
+
+        tasks = [asyncio.ensure_future(fetch(symbol)) for symbol in missing]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                symbol, quote = await next_done
+                if quote:
+                    for row in holding_rows({symbol: quote}):
+                        yield row
+        finally:
+            # The client may have gone away mid-stream
+            for task in tasks:
+                task.cancel()
+
+        unresolved = [symbol for symbol in missing if symbol not in stock_quote_map]
+        stale_map = await self._load_last_good_stock_quotes(unresolved) if unresolved else {}
+        for row in holding_rows(stale_map, set(stale_map)):
+            yield row
+
+        holding_metrics_list, portfolio_summary = value_portfolio(holdings, stock_quote_map, set(stale_map))
+        weights: Dict[str, float] = defaultdict(float)
+        for holding_metrics in holding_metrics_list:
+            weights[holding_metrics.symbol] += holding_metrics.weightage
+        yield PortfolioStreamSummary(portfolio_summary=portfolio_summary, weights=dict(weights))
 
-            return holding_metrics_list, portfolio_summary, stock_details_map
-        except Exception as e:
-            raise RuntimeError(f"Error calculating current value and P&L: {str(e)}")
-        
     async def analyze_portfolio_genai(self, holdings: List[Holding], user_id: int = None) -> str:
         """
         Analyze the portfolio using a generative AI model.
@@ -175,12 +227,10 @@ class PortfolioMetrics:
                 return "No holdings to analyze."
             
             if user_id:
-                cache_key = f"portfolio_briefing_genai:{user_id}"
+                cache_key = cache_keys.key("portfolio_briefing_genai", str(user_id))
                 cached_portfolio_briefing = await self.cache.get(cache_key)
                 if cached_portfolio_briefing:
-                    print(f"Cache hit for {cache_key}")
                     return cached_portfolio_briefing
-                print(f"Cache miss for {cache_key}")
 
             holdings_metrics_list, portfolio_summary, _ = await self.calculate_current_value_and_pnl(holdings)
 
@@ -212,26 +262,11 @@ class PortfolioMetrics:
 
             if user_id:
                 await self.cache.set(cache_key, briefing, expire_minutes=20)
-                print(f"Cached briefing for {cache_key}")
 
             return briefing
         except Exception as e:
             raise RuntimeError(f"Error analyzing portfolio: {str(e)}")
         
-    def _extract_beta(self, stock_details: ISMStockDetailsResponse) -> float:
-            try:
-                if not stock_details.key_metrics:
-                    return 0.0
-
-                for metric in stock_details.key_metrics.price_and_volume:
-                    if metric.key == "beta" and metric.value:
-                        return float(metric.value)
-                
-                return 0.0
-            except (AttributeError, ValueError) as e:
-                print(f"Error extracting beta: {str(e)}")
-                return 0.0
-
     def _calculate_concentration_metrics(self, holdings_metrics: List[HoldingMetrics]) -> Tuple[float, float, float]:
         """
         Calculate concentration risk metrics.
@@ -253,6 +288,13 @@ class PortfolioMetrics:
         """
         Calculate risk metrics for the portfolio.
         """
+        if self.context is not None:
+            return await self.context.memoize(
+                ("risk_metrics", holdings_fingerprint(holdings)), lambda: self._calculate_risk_metrics(holdings)
+            )
+        return await self._calculate_risk_metrics(holdings)
+
+    async def _calculate_risk_metrics(self, holdings: List[Holding]) -> tuple[List[StockRiskMetrics], PortfolioRiskMetrics]:
         try:
             if not holdings:
                 return [], PortfolioRiskMetrics(
@@ -265,16 +307,16 @@ class PortfolioMetrics:
                     sector_concentration=0.0
                 )
 
-            holding_metrics_list, portfolio_summary, stock_details_map = await self.calculate_current_value_and_pnl(holdings)
+            holding_metrics_list, portfolio_summary, stock_quote_map = await self.calculate_current_value_and_pnl(holdings)
 
             portfolio_beta = Decimal('0')
             stock_risk_metrics_list: List[StockRiskMetrics] = []
             for holding in holding_metrics_list:
-                stock_details = stock_details_map.get(holding.symbol)
-                if not stock_details:
+                stock_quote = stock_quote_map.get(holding.symbol)
+                if not stock_quote:
                     continue
 
-                beta = self._extract_beta(stock_details)
+                beta = stock_quote.beta or 0.0
                 weight = Decimal(str(holding.weightage)) / Decimal('100')
                 portfolio_beta += (weight * Decimal(str(beta)))
 
@@ -283,14 +325,19 @@ class PortfolioMetrics:
                     beta=beta,
                     weightage=holding.weightage,
                     unrealized_pnl=holding.unrealized_pnl,
-                    risk_meter=stock_details.risk_meter.category_name if stock_details.risk_meter and stock_details.risk_meter.category_name else "Unknown",
-                    standard_deviation=stock_details.risk_meter.std_dev if stock_details.risk_meter and stock_details.risk_meter.std_dev else 0.0
+                    risk_meter=stock_quote.risk_meter.category_name if stock_quote.risk_meter and stock_quote.risk_meter.category_name else "Unknown",
+                    standard_deviation=stock_quote.risk_meter.std_dev if stock_quote.risk_meter and stock_quote.risk_meter.std_dev else 0.0
                 )
                 stock_risk_metrics_list.append(stock_risk_metrics)
 
             top_3_weightage, herfindahl, sector_concentration = self._calculate_concentration_metrics(holding_metrics_list)
 
-            portfolio_standard_deviation = 0.0
+            symbol_weights = defaultdict(float)
+            for holding in holding_metrics_list:
+                symbol_weights[holding.symbol] += holding.weightage / 100
+            portfolio_standard_deviation = await self.risk_model.portfolio_volatility(symbol_weights)
+            # Both share one covariance, only simulate once it is loaded
+            value_at_risk = await self.risk_model.value_at_risk(symbol_weights) if portfolio_standard_deviation is not None else None
 
             portfolio_risk_metrics=PortfolioRiskMetrics(
                 beta=float(portfolio_beta),
@@ -299,13 +346,44 @@ class PortfolioMetrics:
                 standard_deviation=portfolio_standard_deviation,
                 top_3_holdings_weightage=top_3_weightage,
                 herfindahl_index=herfindahl,
-                sector_concentration=sector_concentration
+                sector_concentration=sector_concentration,
+                value_at_risk=value_at_risk
             )
 
             return stock_risk_metrics_list, portfolio_risk_metrics
         except Exception as e:
             raise RuntimeError(f"Error calculating risk metrics: {str(e)}")
         
+    async def calculate_dashboard(self, holdings: List[Holding], sections: Collection[DashboardSection]) -> PortfolioDashboardResponse:
+        """
+        The requested dashboard sections from one valuation over one set of quotes.
+        Risk metrics are computed only when requested; concentration alone only needs the valuation.
+        """
+        try:
+            dashboard = PortfolioDashboardResponse()
+            holding_metrics_list, portfolio_summary, _ = await self.calculate_current_value_and_pnl(holdings)
+            if DashboardSection.HOLDINGS in sections:
+                dashboard.holding_metrics = holding_metrics_list
+            if DashboardSection.SUMMARY in sections:
+                dashboard.portfolio_summary = portfolio_summary
+
+            if DashboardSection.RISK in sections:
+                # Reuses the valuation above through the context memo
+                dashboard.stocks_risk_metrics, dashboard.portfolio_risk_metrics = await self.calculate_risk_metrics(holdings)
+
+            if DashboardSection.CONCENTRATION in sections:
+                if dashboard.portfolio_risk_metrics is not None:
+                    risk = dashboard.portfolio_risk_metrics
+                    dashboard.concentration = ConcentrationMetrics(risk.top_3_holdings_weightage, risk.herfindahl_index, risk.sector_concentration)
+                elif holding_metrics_list:
+                    dashboard.concentration = ConcentrationMetrics(*self._calculate_concentration_metrics(holding_metrics_list))
+                else:
+                    dashboard.concentration = ConcentrationMetrics(0.0, 0.0, 0.0)
+
+            return dashboard
+        except Exception as e:
+            raise RuntimeError(f"Error calculating portfolio dashboard: {str(e)}")
+
     async def analyze_portfolio_risk_genai(self, holdings: List[Holding], user_id: int = None) -> str:
         """
         Analyze the portfolio risk using a generative AI model.
@@ -315,12 +393,10 @@ class PortfolioMetrics:
                 return "No holdings to analyze."
             
             if user_id:
-                cache_key = f"portfolio_risk_analysis_genai:{user_id}"
+                cache_key = cache_keys.key("portfolio_risk_analysis_genai", str(user_id))
                 cached_portfolio_risk_analysis = await self.cache.get(cache_key)
                 if cached_portfolio_risk_analysis:
-                    print(f"Cache hit for {cache_key}")
                     return cached_portfolio_risk_analysis
-                print(f"Cache miss for {cache_key}")
 
             stock_risk_metrics_list, portfolio_risk_metrics = await self.calculate_risk_metrics(holdings)
 
@@ -339,6 +415,8 @@ class PortfolioMetrics:
 
             pnl is profit and loss
             pct is percentage
+            the portfolio standard_deviation is the annualized volatility of daily returns in percent, None if not computed yet
+            value_at_risk figures are Monte Carlo losses over horizon_days in percent of the portfolio value (var_99 is exceeded on 1% of paths, expected_shortfall_99 is the average loss beyond it), None if not computed yet
 
             Provide the response in the following JSON format. Don't include any explanations outside the JSON structure. ONLY RETURN THE JSON.
             {{
@@ -351,9 +429,9 @@ class PortfolioMetrics:
 
             risk_analysis = self.openai_api.generate_text(prompt)
 
-            if user_id:
+            # Don't pin an analysis written without volatility for the whole TTL
+            if user_id and portfolio_risk_metrics.standard_deviation is not None:
                 await self.cache.set(cache_key, risk_analysis, expire_minutes=20)
-                print(f"Cached risk analysis for {cache_key}")
 
             return risk_analysis
         except Exception as e:
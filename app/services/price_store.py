@@ -0,0 +1,116 @@
+import datetime
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+
+from app.db.session import SessionLocal
+from app.schemas.stock_price import StockPrice
+
+DAILY = "1d"
+INTRADAY = "intraday"
+
+
+@dataclass
+class PriceSeries:
+    symbol: str
+    # UTC timestamps as datetime64[us], ascending; daily closes sit at 00:00 UTC of their trading date
+    ts: np.ndarray
+    close: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.close)
+
+    def dates(self) -> List[str]:
+        return np.datetime_as_string(self.ts, unit="D").tolist()
+
+
+def _empty_series(symbol: str) -> PriceSeries:
+    return PriceSeries(symbol=symbol, ts=np.empty(0, dtype="datetime64[us]"), close=np.empty(0))
+
+
+def daily_timestamp(date: str) -> datetime.datetime:
+    """Storage timestamp of a trading date given as YYYY-MM-DD"""
+    return datetime.datetime.fromisoformat(date).replace(tzinfo=datetime.timezone.utc)
+
+
+class PriceStore:
+    """
+    Append-only store of stock prices in Postgres, keyed by (symbol, interval, ts).
+
+    Daily closes come from the upstream historical endpoint, intraday points from
+    quotes the price warmer fetches anyway. Rows are never updated: re-appending
+    a point that already exists is a no-op. Methods are blocking, call them via
+    asyncio.to_thread from async code.
+    """
+
+    def append(self, interval: str, points: Iterable[Tuple[str, datetime.datetime, float]]) -> int:
+        """Insert (symbol, ts, close) points, returns how many were new"""
+        rows = [{"symbol": symbol, "interval": interval, "ts": ts, "close": close} for symbol, ts, close in points]
+        if not rows:
+            return 0
+        db = SessionLocal()
+        try:
+            statement = insert(StockPrice).values(rows).on_conflict_do_nothing(index_elements=["symbol", "interval", "ts"])
+            inserted = db.execute(statement).rowcount
+            db.commit()
+            return inserted
+        except Exception as e:
+            db.rollback()
+            raise RuntimeError(f"Error appending {len(rows)} stock prices: {str(e)}")
+        finally:
+            db.close()
+
+    def read_range(self, symbol: str, start: datetime.datetime, end: Optional[datetime.datetime] = None, interval: str = DAILY) -> PriceSeries:
+        """Prices of symbol with start <= ts <= end"""
+        return self.read_many([symbol], start, end, interval)[symbol]
+
+    def read_many(self, symbols: List[str], start: datetime.datetime, end: Optional[datetime.datetime] = None,
+                  interval: str = DAILY) -> Dict[str, PriceSeries]:
+        """Prices of every symbol with start <= ts <= end in one index range scan, empty series for unknown symbols"""
+        statement = (
+            select(StockPrice.symbol, StockPrice.ts, StockPrice.close)
+            .where(StockPrice.symbol.in_(symbols), StockPrice.interval == interval, StockPrice.ts >= start)
+            .order_by(StockPrice.symbol, StockPrice.ts)
+        )
+        if end is not None:
+            statement = statement.where(StockPrice.ts <= end)
+
+        db = SessionLocal()
+        try:
+            rows = db.execute(statement).all()
+        finally:
+            db.close()
+
+        series = {symbol: _empty_series(symbol) for symbol in symbols}
+        if not rows:
+            return series
+
+        row_symbols = np.array([row[0] for row in rows], dtype=object)
+        ts = np.array([row[1].astimezone(datetime.timezone.utc).replace(tzinfo=None) for row in rows], dtype="datetime64[us]")
+        close = np.fromiter((row[2] for row in rows), dtype=np.float64, count=len(rows))
+        # Rows are ordered by symbol, so each symbol is one contiguous slice
+        boundaries = np.flatnonzero(row_symbols[1:] != row_symbols[:-1]) + 1
+        for begin, stop in zip(np.concatenate(([0], boundaries)), np.concatenate((boundaries, [len(rows)]))):
+            symbol = row_symbols[begin]
+            series[symbol] = PriceSeries(symbol=symbol, ts=ts[begin:stop], close=close[begin:stop])
+        return series
+
+    def latest_timestamps(self, symbols: List[str], interval: str = DAILY) -> Dict[str, datetime.datetime]:
+        """Newest stored timestamp per symbol, symbols with no rows are left out"""
+        db = SessionLocal()
+        try:
+            rows = (
+                db.query(StockPrice.symbol, func.max(StockPrice.ts))
+                .filter(StockPrice.symbol.in_(symbols), StockPrice.interval == interval)
+                .group_by(StockPrice.symbol)
+                .all()
+            )
+            return {symbol: ts for symbol, ts in rows}
+        finally:
+            db.close()
+
+
+price_store = PriceStore()
@@ -0,0 +1,139 @@
+import asyncio
+import datetime
+from typing import List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from app.cache.keys import cache_keys
+from app.cache.redis import RedisService
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.ism_api.stock import StockQuote
+from app.schemas.holding import Holding
+from app.services.ism_api import ISMApi, ism_api
+from app.services.portfolio_metrics import PortfolioMetrics
+from app.services.price_store import INTRADAY, price_store
+from app.services.rate_limiter import Priority
+
+IST = ZoneInfo("Asia/Kolkata")
+NSE_MARKET_OPEN = datetime.time(9, 15)
+NSE_MARKET_CLOSE = datetime.time(15, 30)
+
+
+def is_nse_market_open(now: Optional[datetime.datetime] = None) -> bool:
+    """NSE regular session, Monday to Friday 09:15-15:30 IST. Exchange holidays are not modelled."""
+    now = (now or datetime.datetime.now(datetime.timezone.utc)).astimezone(IST)
+    return now.weekday() < 5 and NSE_MARKET_OPEN <= now.time() <= NSE_MARKET_CLOSE
+
+
+class PriceWarmer:
+    """
+    Keeps stock quotes for every held symbol warm so user requests hit the cache.
+
+    Runs on every worker, but only the worker holding the Redis lease refreshes.
+    During NSE trading hours quotes are refreshed shortly before they expire;
+    outside them prices don't move, so quotes are written with a TTL that spans
+    the next, much longer, refresh interval. Quotes refreshed during trading
+    hours are also appended to the price store as intraday points.
+    """
+    LEASE_KEY = cache_keys.fixed("lease", "price_warmer")
+
+    def __init__(self, ism_api: ISMApi):
+        self.cache = RedisService()
+        self.portfolio_metrics = PortfolioMetrics(ism_api)
+        self._lease_token: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._lease_token:
+            await self.cache.release_lock(self.LEASE_KEY, self._lease_token)
+            self._lease_token = None
+
+    def _interval_seconds(self) -> int:
+        if is_nse_market_open():
+            return settings.PRICE_WARMER_MARKET_INTERVAL_SECONDS
+        return settings.PRICE_WARMER_OFF_HOURS_INTERVAL_SECONDS
+
+    async def _hold_lease(self, interval_seconds: int) -> bool:
+        # The lease outlives one interval plus a full warm pass so a busy leader keeps it
+        lease_milliseconds = (interval_seconds * 3) * 1000
+        if self._lease_token and await self.cache.extend_lock(self.LEASE_KEY, self._lease_token, lease_milliseconds):
+            return True
+        self._lease_token = await self.cache.acquire_lock(self.LEASE_KEY, lease_milliseconds)
+        return self._lease_token is not None
+
+    async def _run(self) -> None:
+        while True:
+            interval_seconds = self._interval_seconds()
+            try:
+                if await self._hold_lease(interval_seconds):
+                    await self.warm_once(interval_seconds)
+            except Exception as e:
+                print(f"Price warmer error: {str(e)}")
+            await asyncio.sleep(interval_seconds)
+
+    @staticmethod
+    def _load_held_symbols() -> List[Tuple[str, str]]:
+        db = SessionLocal()
+        try:
+            rows = db.query(Holding.symbol, Holding.isin_number).filter(Holding.isin_number.isnot(None)).distinct().all()
+            return [(symbol, isin_number) for symbol, isin_number in rows]
+        finally:
+            db.close()
+
+    async def warm_once(self, interval_seconds: int) -> int:
+        """
+        Refresh quotes that would expire before the next pass, returns how many were refreshed.
+        """
+        held_symbols = await asyncio.to_thread(self._load_held_symbols)
+
+        market_open = is_nse_market_open()
+        # Off hours the quote has to survive until the next pass, during hours keep the normal freshness TTL
+        quote_expire_minutes = None if market_open else interval_seconds // 60 + settings.STOCK_QUOTE_TTL_MINUTES
+
+        semaphore = asyncio.Semaphore(settings.PRICE_WARMER_CONCURRENCY)
+
+        async def refresh(symbol: str, isin_number: str) -> Optional[StockQuote]:
+            async with semaphore:
+                remaining_seconds = await self.cache.ttl(cache_keys.key("stock_quote", symbol))
+                # A quote written off hours outlives the normal TTL, replace it once the market opens
+                written_off_hours = market_open and remaining_seconds > settings.STOCK_QUOTE_TTL_MINUTES * 60
+                if remaining_seconds > interval_seconds * 2 and not written_off_hours:
+                    return None
+                return await self.portfolio_metrics.refresh_stock_details(
+                    symbol, isin_number, priority=Priority.BACKGROUND, quote_expire_minutes=quote_expire_minutes
+                )
+
+        results = await asyncio.gather(*[refresh(symbol, isin_number) for symbol, isin_number in held_symbols])
+        refreshed = sum(1 for result in results if result)
+        if market_open and refreshed:
+            await self._record_intraday_prices([(symbol, quote) for (symbol, _), quote in zip(held_symbols, results) if quote])
+        print(f"Price warmer refreshed {refreshed}/{len(held_symbols)} symbols (market open: {market_open})")
+        return refreshed
+
+    @staticmethod
+    async def _record_intraday_prices(quotes: List[Tuple[str, StockQuote]]) -> None:
+        observed_at = datetime.datetime.now(datetime.timezone.utc).replace(second=0, microsecond=0)
+        points = []
+        for symbol, quote in quotes:
+            price = quote.current_price.nse or quote.current_price.bse
+            if price:
+                points.append((symbol, observed_at, float(price)))
+        try:
+            await asyncio.to_thread(price_store.append, INTRADAY, points)
+        except Exception as e:
+            # Quotes are already cached, a missed intraday point is not worth failing the pass
+            print(f"Error recording intraday prices: {str(e)}")
+
+
+price_warmer = PriceWarmer(ism_api)
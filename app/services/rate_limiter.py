@@ -0,0 +1,117 @@
+import asyncio
+import enum
+import hashlib
+import time
+
+from app.cache.keys import cache_keys
+from app.cache.redis import RedisService
+from app.core.config import settings
+from app.core.metrics import metrics
+
+# Refills the bucket from Redis server time and takes one token if at least
+# `reserve` tokens would remain afterwards. Returns 0 when a token was taken,
+# otherwise the number of milliseconds until one is expected to be available.
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local reserve = tonumber(ARGV[3])
+local clock = redis.call("TIME")
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+
+local state = redis.call("HMGET", KEYS[1], "tokens", "ts")
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate / 1000)
+
+local wait = 0
+if tokens >= 1 + reserve then
+    tokens = tokens - 1
+else
+    wait = math.ceil((1 + reserve - tokens) * 1000 / rate)
+end
+
+redis.call("HSET", KEYS[1], "tokens", tostring(tokens), "ts", now)
+redis.call("PEXPIRE", KEYS[1], math.ceil(burst * 1000 / rate) + 1000)
+return wait
+"""
+
+limiter_wait_seconds = metrics.histogram("ism_rate_limiter_wait_seconds", "Time spent waiting for an upstream API token")
+limiter_acquired_total = metrics.counter("ism_rate_limiter_acquired_total", "Upstream API tokens acquired")
+limiter_timeouts_total = metrics.counter("ism_rate_limiter_timeouts_total", "Requests that gave up waiting for an upstream API token")
+limiter_errors_total = metrics.counter("ism_rate_limiter_errors_total", "Limiter calls that failed open because Redis was unavailable")
+
+
+class Priority(str, enum.Enum):
+    INTERACTIVE = "interactive"
+    BACKGROUND = "background"
+
+
+class RateLimitTimeout(Exception):
+    pass
+
+
+class TokenBucketRateLimiter:
+    """
+    Redis-backed token bucket shared by every worker using the same key.
+
+    Background callers may only take a token while `interactive_reserve` tokens
+    stay in the bucket, so user-facing requests are served first under load.
+    """
+
+    def __init__(self, key: str, rate_per_second: float, burst: int, interactive_reserve: int,
+                 interactive_max_wait_seconds: float, background_max_wait_seconds: float):
+        self.cache = RedisService()
+        self.key = key
+        self.rate_per_second = rate_per_second
+        self.burst = burst
+        self.reserves = {
+            Priority.INTERACTIVE: 0,
+            Priority.BACKGROUND: min(interactive_reserve, max(burst - 1, 0)),
+        }
+        self.max_waits = {
+            Priority.INTERACTIVE: interactive_max_wait_seconds,
+            Priority.BACKGROUND: background_max_wait_seconds,
+        }
+
+    async def acquire(self, priority: Priority = Priority.INTERACTIVE) -> float:
+        """
+        Wait for a token, returns the time spent waiting in seconds.
+        Raises RateLimitTimeout if no token is available within the lane's max wait.
+        """
+        started = time.perf_counter()
+        deadline = started + self.max_waits[priority]
+        while True:
+            wait_milliseconds = await self.cache.run_script(
+                TOKEN_BUCKET_SCRIPT,
+                keys=[self.key],
+                args=[self.rate_per_second, self.burst, self.reserves[priority]],
+            )
+            if wait_milliseconds is None:
+                # Fail open, the upstream 429s are a better signal than refusing all traffic
+                limiter_errors_total.inc(lane=priority.value)
+                wait_milliseconds = 0
+
+            now = time.perf_counter()
+            if wait_milliseconds <= 0:
+                waited = now - started
+                limiter_acquired_total.inc(lane=priority.value)
+                limiter_wait_seconds.observe(waited, lane=priority.value)
+                return waited
+
+            if now + wait_milliseconds / 1000 > deadline:
+                limiter_timeouts_total.inc(lane=priority.value)
+                limiter_wait_seconds.observe(now - started, lane=priority.value)
+                raise RateLimitTimeout(f"Rate limit wait exceeded {self.max_waits[priority]}s for {priority.value} request")
+
+            await asyncio.sleep(wait_milliseconds / 1000)
+
+
+# One bucket per API key, shared by all workers and all ISMApi methods
+ism_rate_limiter = TokenBucketRateLimiter(
+    key=cache_keys.fixed("rate_limit", "ism_api", hashlib.sha256(settings.INDIAN_STOCK_MARKET_API_KEY.encode()).hexdigest()[:16]),
+    rate_per_second=settings.ISM_API_RATE_LIMIT_PER_SECOND,
+    burst=settings.ISM_API_RATE_LIMIT_BURST,
+    interactive_reserve=settings.ISM_API_RATE_LIMIT_INTERACTIVE_RESERVE,
+    interactive_max_wait_seconds=settings.ISM_API_RATE_LIMIT_INTERACTIVE_MAX_WAIT_SECONDS,
+    background_max_wait_seconds=settings.ISM_API_RATE_LIMIT_BACKGROUND_MAX_WAIT_SECONDS,
+)
@@ -0,0 +1,42 @@
+import asyncio
+import random
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Exponential backoff with full jitter: attempt n sleeps uniformly in [0, min(max_delay, base * 2**n)]"""
+    attempts: int
+    base_delay_seconds: float
+    max_delay_seconds: float
+
+    def delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay_seconds, self.base_delay_seconds * 2 ** attempt))
+
+
+async def retry_until_deadline(call: Callable[[], Awaitable[Optional[T]]], policy: RetryPolicy, deadline: float,
+                               give_up: Callable[[], bool] = lambda: False) -> Optional[T]:
+    """
+    Await call() until it returns a result, at most policy.attempts times and never past deadline
+    (event loop time). call() signals failure by returning None. give_up() is checked between
+    attempts, e.g. to stop retrying while a circuit breaker is open. Returns None when out of
+    attempts or time; a call still running at the deadline is abandoned, not cancelled, if it shields itself.
+    """
+    loop = asyncio.get_running_loop()
+    for attempt in range(policy.attempts):
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            return None
+        try:
+            result = await asyncio.wait_for(call(), remaining)
+        except asyncio.TimeoutError:
+            return None
+        if result is not None:
+            return result
+        if attempt == policy.attempts - 1 or give_up():
+            return None
+        await asyncio.sleep(min(policy.delay(attempt), max(deadline - loop.time(), 0)))
+    return None
@@ -0,0 +1,286 @@
+import asyncio
+import datetime
+import hashlib
+from typing import Dict, List, Optional, Set, Tuple
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+from app.cache.keys import cache_keys
+from app.cache.local_cache import local_cache
+from app.cache.redis import RedisService
+from app.cache.single_flight import SingleFlight
+from app.core.config import settings
+from app.models.ism_api.historical import PriceHistory
+from app.models.portfolio_metrics import CovarianceEstimate, ValueAtRisk
+from app.services.ism_api import ISMApi
+from app.services.price_store import DAILY, daily_timestamp, price_store
+from app.services.rate_limiter import Priority
+from app.services.value_at_risk import simulate_value_at_risk
+
+TRADING_DAYS_PER_YEAR = 252
+IST = ZoneInfo("Asia/Kolkata")
+
+# One flight per worker so concurrent requests share a load. The lock outlives a full
+# history load (an upstream call per symbol in the background lane), so other workers
+# wait for the result instead of starting their own.
+covariance_flight = SingleFlight(
+    lock_milliseconds=settings.RISK_MODEL_LOAD_LOCK_SECONDS * 1000,
+    wait_seconds=settings.RISK_MODEL_LOAD_LOCK_SECONDS,
+    poll_interval_seconds=0.5,
+)
+# Loads that outlived the request that started them, kept referenced until they finish
+_background_loads: Set[asyncio.Future] = set()
+
+
+def _forget_background_load(load: asyncio.Future) -> None:
+    _background_loads.discard(load)
+    if not load.cancelled() and load.exception() is not None:
+        print(f"Background covariance load failed: {str(load.exception())}")
+
+
+def log_returns(histories: List[PriceHistory], min_observations: int) -> Tuple[List[str], np.ndarray]:
+    """
+    Daily log returns on the dates every usable symbol traded, shape (observations, symbols).
+    Symbols with fewer than min_observations prices are dropped rather than truncating everyone else.
+    """
+    usable = [history for history in histories if len(history.prices) > min_observations]
+    if not usable:
+        return [], np.empty((0, 0))
+
+    common_dates = set(usable[0].dates)
+    for history in usable[1:]:
+        common_dates.intersection_update(history.dates)
+    dates = sorted(common_dates)
+    if len(dates) <= min_observations:
+        return [], np.empty((0, 0))
+
+    prices = np.empty((len(dates), len(usable)))
+    for column, history in enumerate(usable):
+        by_date = dict(zip(history.dates, history.prices))
+        prices[:, column] = [by_date[date] for date in dates]
+    return [history.symbol for history in usable], np.diff(np.log(prices), axis=0)
+
+
+def ledoit_wolf_covariance(returns: np.ndarray) -> Tuple[np.ndarray, float]:
+    """
+    Sample covariance shrunk towards a scaled identity with the Ledoit-Wolf optimal
+    intensity, which keeps the estimate well conditioned with few observations per symbol.
+    """
+    observations, symbol_count = returns.shape
+    centered = returns - returns.mean(axis=0)
+    sample = centered.T @ centered / observations
+    mu = np.trace(sample) / symbol_count
+
+    squared = centered ** 2
+    pi = (squared.T @ squared).sum() / observations - (sample ** 2).sum()
+    delta = ((sample - mu * np.eye(symbol_count)) ** 2).sum()
+    shrinkage = 0.0 if delta == 0 else float(min(max(pi / observations / delta, 0.0), 1.0))
+    return (1 - shrinkage) * sample + shrinkage * mu * np.eye(symbol_count), shrinkage
+
+
+def portfolio_volatility(weights: np.ndarray, covariance: np.ndarray) -> float:
+    """sqrt(w'Σw), in the units of the covariance"""
+    return float(np.sqrt(max(weights @ covariance @ weights, 0.0)))
+
+
+class RiskModel:
+    """
+    Portfolio volatility from a shrunk covariance of held symbols' daily returns.
+
+    A cold covariance is loaded in the background: requests wait for it only
+    up to settings.RISK_MODEL_REQUEST_DEADLINE_SECONDS and otherwise report the
+    figures as unavailable, while the load goes on filling the cache.
+
+    Price histories are read from Redis, then from the local price store when
+    it is up to date, and only then from the upstream, whose answers are
+    appended to the store so the next day only needs the store. The
+    covariance of a symbol set is cached per IST date in Redis and, already
+    parsed into an array, in the local cache, so a repeat request only costs
+    a matrix-vector product.
+    """
+
+    def __init__(self, ism_api: ISMApi):
+        self.ism_api = ism_api
+        self.cache = RedisService()
+
+    async def portfolio_volatility(self, weights: Dict[str, float]) -> Optional[float]:
+        """
+        Annualized volatility in percent for weights by symbol (fractions summing to 1).
+        Symbols without enough history are left out and the remaining weights rescaled.
+        None while the covariance is still being loaded.
+        """
+        weights = {symbol: weight for symbol, weight in weights.items() if weight > 0}
+        if not weights:
+            return 0.0
+        covered = await self.get_covariance(sorted(weights))
+        if covered is None:
+            return None
+        symbols, covariance = covered
+        if not symbols:
+            return 0.0
+        vector = np.array([weights[symbol] for symbol in symbols])
+        if vector.sum() <= 0:
+            return 0.0
+        return portfolio_volatility(vector / vector.sum(), covariance) * 100
+
+    async def value_at_risk(self, weights: Dict[str, float]) -> Optional[ValueAtRisk]:
+        """
+        Monte Carlo VaR and expected shortfall for weights by symbol, over the covariance
+        portfolio_volatility uses. Cached per portfolio fingerprint: the covered symbols'
+        weights, the simulation settings and the covariance date.
+        """
+        weights = {symbol: weight for symbol, weight in weights.items() if weight > 0}
+        if not weights:
+            return None
+        covered = await self.get_covariance(sorted(weights))
+        if covered is None or not covered[0]:
+            return None
+        symbols, covariance = covered
+        vector = np.array([weights[symbol] for symbol in symbols])
+        if vector.sum() <= 0:
+            return None
+        vector = vector / vector.sum()
+
+        as_of = datetime.datetime.now(IST).date().isoformat()
+        horizon_days, paths, seed = settings.VAR_HORIZON_DAYS, settings.VAR_PATHS, settings.VAR_SEED
+        # Weights rounded so price ticks within a day don't defeat the cache
+        fingerprint = ",".join(f"{symbol}={weight:.4f}" for symbol, weight in zip(symbols, vector))
+        portfolio = hashlib.sha256(f"{fingerprint}|{horizon_days}|{paths}|{seed}".encode()).hexdigest()[:16]
+        key = cache_keys.key("value_at_risk", portfolio, as_of)
+
+        cached = await self.cache.get_model(key, ValueAtRisk)
+        if cached is not None:
+            return cached
+
+        results = await simulate_value_at_risk(vector, covariance, horizon_days=horizon_days, paths=paths, seed=seed)
+        estimate = ValueAtRisk(
+            horizon_days=horizon_days,
+            paths=paths,
+            seed=seed,
+            as_of=as_of,
+            var_95=results[0.95]["var"] * 100,
+            var_99=results[0.99]["var"] * 100,
+            expected_shortfall_95=results[0.95]["expected_shortfall"] * 100,
+            expected_shortfall_99=results[0.99]["expected_shortfall"] * 100,
+        )
+        await self.cache.set(key, estimate.model_dump(), expire_minutes=settings.COVARIANCE_TTL_MINUTES)
+        return estimate
+
+    async def get_covariance(self, symbols: List[str], wait_seconds: Optional[float] = settings.RISK_MODEL_REQUEST_DEADLINE_SECONDS
+                             ) -> Optional[Tuple[List[str], np.ndarray]]:
+        """
+        Symbols with enough history, in matrix order, and their annualized covariance;
+        no symbols if none has enough history. None if a load is still running after
+        wait_seconds (None waits for it), the load carries on and fills the cache.
+        """
+        as_of = datetime.datetime.now(IST).date().isoformat()
+        symbol_set = hashlib.sha256(",".join(symbols).encode()).hexdigest()[:16]
+        key = cache_keys.key("covariance", symbol_set, as_of)
+
+        covered = local_cache.get(key)
+        if covered is not None:
+            return covered
+
+        estimate = await self.cache.get_model(key, CovarianceEstimate)
+        if estimate is None:
+            load = asyncio.ensure_future(covariance_flight.do(
+                key=key,
+                load=lambda: self._estimate_covariance(key, symbols, as_of),
+                load_cached=lambda: self.cache.get_model(key, CovarianceEstimate),
+            ))
+            try:
+                # Shielded so the deadline abandons the load rather than cancelling it
+                estimate = await asyncio.wait_for(asyncio.shield(load), wait_seconds)
+            except asyncio.TimeoutError:
+                _background_loads.add(load)
+                load.add_done_callback(_forget_background_load)
+                print(f"Covariance for {len(symbols)} symbols not ready within {wait_seconds}s, loading in the background")
+                return None
+        if estimate is None:
+            return None
+
+        covered = (estimate.symbols, np.array(estimate.matrix))
+        local_cache.set(key, covered, ttl_seconds=settings.COVARIANCE_TTL_MINUTES * 60)
+        return covered
+
+    async def _estimate_covariance(self, key: str, symbols: List[str], as_of: str) -> CovarianceEstimate:
+        histories = await self._load_price_histories(symbols)
+        covered_symbols, returns = log_returns(histories, settings.RISK_MIN_OBSERVATIONS)
+        if covered_symbols:
+            covariance, shrinkage = ledoit_wolf_covariance(returns)
+            estimate = CovarianceEstimate(
+                symbols=covered_symbols,
+                as_of=as_of,
+                observations=returns.shape[0],
+                shrinkage=shrinkage,
+                matrix=(covariance * TRADING_DAYS_PER_YEAR).tolist(),
+            )
+        else:
+            # Cached too, so symbols without history don't trigger a load on every request
+            estimate = CovarianceEstimate(symbols=[], as_of=as_of, observations=0, shrinkage=0.0, matrix=[])
+        await self.cache.set(key, estimate.model_dump(), expire_minutes=settings.COVARIANCE_TTL_MINUTES)
+        return estimate
+
+    async def _load_price_histories(self, symbols: List[str]) -> List[PriceHistory]:
+        keys = [cache_keys.key("price_history", symbol, settings.RISK_HISTORY_PERIOD) for symbol in symbols]
+        cached = await self.cache.get_models(keys, PriceHistory)
+        histories = [history for history in cached if history is not None]
+
+        missing = {symbol: key for symbol, key, history in zip(symbols, keys, cached) if history is None}
+        if not missing:
+            return histories
+
+        loaded = await self._read_stored_histories(list(missing))
+        upstream = [symbol for symbol in missing if symbol not in loaded]
+        fetched = await asyncio.gather(*[self._fetch_price_history(symbol) for symbol in upstream])
+        fetched = [history for history in fetched if history is not None]
+        if fetched:
+            await self._store_histories(fetched)
+        loaded.update((history.symbol, history) for history in fetched)
+
+        await self.cache.set_many(
+            {missing[symbol]: history.model_dump() for symbol, history in loaded.items()},
+            expire_minutes=settings.PRICE_HISTORY_TTL_MINUTES,
+        )
+        histories.extend(loaded.values())
+        return histories
+
+    @staticmethod
+    async def _read_stored_histories(symbols: List[str]) -> Dict[str, PriceHistory]:
+        """Stored daily closes covering the risk window, for symbols whose newest close is recent enough"""
+        today = datetime.datetime.now(IST).date()
+        start = daily_timestamp((today - datetime.timedelta(days=settings.PRICE_STORE_LOOKBACK_DAYS)).isoformat())
+        fresh_after = np.datetime64(today - datetime.timedelta(days=settings.PRICE_STORE_MAX_AGE_DAYS))
+        try:
+            stored = await asyncio.to_thread(price_store.read_many, symbols, start, None, DAILY)
+        except Exception as e:
+            print(f"Error reading stored price histories: {str(e)}")
+            return {}
+        return {
+            symbol: PriceHistory(symbol=symbol, dates=series.dates(), prices=series.close.tolist())
+            for symbol, series in stored.items()
+            if len(series) > settings.RISK_MIN_OBSERVATIONS and series.ts[-1] >= fresh_after
+        }
+
+    @staticmethod
+    async def _store_histories(histories: List[PriceHistory]) -> None:
+        points = [
+            (history.symbol, daily_timestamp(date), price)
+            for history in histories
+            for date, price in zip(history.dates, history.prices)
+        ]
+        try:
+            await asyncio.to_thread(price_store.append, DAILY, points)
+        except Exception as e:
+            print(f"Error storing price histories: {str(e)}")
+
+    async def _fetch_price_history(self, symbol: str) -> Optional[PriceHistory]:
+        try:
+            response = await self.ism_api.get_historical_prices(symbol, period=settings.RISK_HISTORY_PERIOD, priority=Priority.BACKGROUND)
+        except Exception as e:
+            print(f"Error fetching price history for {symbol}: {str(e)}")
+            return None
+        prices = response.prices()
+        dates = sorted(prices)
+        return PriceHistory(symbol=symbol, dates=dates, prices=[prices[date] for date in dates])
@@ -0,0 +1,124 @@
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from app.models.ism_api.stock import StockQuote
+from app.models.portfolio_metrics import HoldingMetrics, PortfolioSummary, SectorAllocation
+from app.schemas.holding import Holding
+
+# Results match the previous Decimal(str(...)) arithmetic to within this relative
+# tolerance; both round-trip through float64, only the summation order differs.
+RELATIVE_TOLERANCE = 1e-9
+
+
+def value_portfolio(holdings: Sequence[Holding], stock_quote_map: Dict[str, StockQuote],
+                    stale_symbols: Iterable[str] = ()) -> Tuple[List[HoldingMetrics], PortfolioSummary]:
+    """
+    Columnar valuation of holdings against their quotes.
+
+    Holdings without a quote are left out and listed as unavailable. Sectors keep
+    the order in which they first appear among the valued holdings.
+    """
+    return value_portfolios([holdings], stock_quote_map, stale_symbols)[0]
+
+
+def value_portfolios(portfolios: Sequence[Sequence[Holding]], stock_quote_map: Dict[str, StockQuote],
+                     stale_symbols: Iterable[str] = ()) -> List[Tuple[List[HoldingMetrics], PortfolioSummary]]:
+    """
+    Value many portfolios in one vectorized pass, results are in the order of portfolios.
+
+    Every holding row of every portfolio goes into the same arrays; per-portfolio
+    totals and per-(portfolio, sector) values are weighted bincounts over the
+    row's portfolio index. Each summary's stale_symbols and unavailable_symbols
+    only list that portfolio's own symbols.
+    """
+    stale_symbols = set(stale_symbols)
+    portfolio_count = len(portfolios)
+    valued = [
+        (index, holding, stock_quote_map[holding.symbol])
+        for index, holdings in enumerate(portfolios)
+        for holding in holdings
+        if stock_quote_map.get(holding.symbol)
+    ]
+    row_count = len(valued)
+
+    owner = np.fromiter((index for index, _, _ in valued), dtype=np.int64, count=row_count)
+    shares = np.fromiter((holding.shares for _, holding, _ in valued), dtype=np.float64, count=row_count)
+    avg_cost = np.fromiter((holding.avg_cost for _, holding, _ in valued), dtype=np.float64, count=row_count)
+    price = np.fromiter(
+        (float(quote.current_price.nse or quote.current_price.bse or 0.0) for _, _, quote in valued), dtype=np.float64, count=row_count
+    )
+    prev_close = np.fromiter((float(quote.previous_close or 0.0) for _, _, quote in valued), dtype=np.float64, count=row_count)
+    industries = [quote.industry or "Unknown" for _, _, quote in valued]
+
+    cost_basis = shares * avg_cost
+    current_value = shares * price
+    unrealized_pnl = current_value - cost_basis
+    unrealized_pnl_pct = np.divide((price - avg_cost) * 100, avg_cost, out=np.zeros_like(price), where=avg_cost > 0)
+    days_pnl = shares * (price - prev_close)
+
+    total_invested = np.bincount(owner, weights=cost_basis, minlength=portfolio_count)
+    total_current_value = np.bincount(owner, weights=current_value, minlength=portfolio_count)
+    row_total_value = total_current_value[owner]
+    weightage = np.divide(current_value * 100, row_total_value, out=np.zeros_like(current_value), where=row_total_value > 0)
+
+    holding_metrics_lists: List[List[HoldingMetrics]] = [[] for _ in range(portfolio_count)]
+    sector_allocation_lists: List[List[SectorAllocation]] = [[] for _ in range(portfolio_count)]
+
+    if row_count:
+        # Group by (portfolio, sector): integer codes in order of first appearance, then one weighted bincount
+        sector_names, sector_codes = np.unique(np.array(industries, dtype=object), return_inverse=True)
+        group_keys = owner * len(sector_names) + sector_codes
+        _, first_row, group_codes = np.unique(group_keys, return_index=True, return_inverse=True)
+        group_values = np.bincount(group_codes, weights=current_value)
+        group_holdings: List[List[str]] = [[] for _ in first_row]
+        for code, (_, holding, _) in zip(group_codes.tolist(), valued):
+            group_holdings[code].append(holding.symbol)
+
+        for code in np.argsort(first_row).tolist():
+            row = int(first_row[code])
+            index = int(owner[row])
+            portfolio_value = total_current_value[index]
+            sector_allocation_lists[index].append(SectorAllocation(
+                sector=industries[row],
+                current_value=float(group_values[code]),
+                weight=float(group_values[code] * 100 / portfolio_value) if portfolio_value > 0 else 0.0,
+                holdings=group_holdings[code],
+            ))
+
+        for (index, holding, _), industry, row_price, row_cost_basis, row_current_value, row_pnl, row_pnl_pct, row_days_pnl, row_weightage in zip(
+            valued, industries, price.tolist(), cost_basis.tolist(), current_value.tolist(), unrealized_pnl.tolist(),
+            unrealized_pnl_pct.tolist(), days_pnl.tolist(), weightage.tolist(),
+        ):
+            holding_metrics_lists[index].append(HoldingMetrics(
+                symbol=holding.symbol,
+                name=holding.name,
+                shares=holding.shares,
+                avg_cost=holding.avg_cost,
+                current_price=row_price,
+                cost_basis=row_cost_basis,
+                current_value=row_current_value,
+                unrealized_pnl=row_pnl,
+                unrealized_pnl_pct=row_pnl_pct,
+                days_pnl=row_days_pnl,
+                weightage=row_weightage,
+                industry=industry,
+                is_stale=holding.symbol in stale_symbols,
+            ))
+
+    results = []
+    for index, holdings in enumerate(portfolios):
+        invested = float(total_invested[index])
+        value = float(total_current_value[index])
+        pnl = value - invested
+        portfolio_summary = PortfolioSummary(
+            total_invested=invested,
+            total_current_value=value,
+            total_pnl=pnl,
+            total_return_pct=pnl / invested * 100 if invested > 0 else 0.0,
+            sector_allocations=sector_allocation_lists[index],
+            stale_symbols=sorted(stale_symbols.intersection(holding.symbol for holding in holdings)),
+            unavailable_symbols=sorted({holding.symbol for holding in holdings if not stock_quote_map.get(holding.symbol)}),
+        )
+        results.append((holding_metrics_lists[index], portfolio_summary))
+    return results
@@ -1,7 +1,12 @@
-from typing import List
-from app.cache.redis import RedisService
+import asyncio
+from typing import Dict, List, Optional, Tuple
+from app.cache.keys import cache_keys
+from app.cache.local_cache import local_cache
+from app.cache.redis import CacheEntry, RedisService
+from app.cache.stale_while_revalidate import stale_while_revalidate
+from app.core.config import settings
 from app.models.ism_api.news import ISMNewsArticle
-from app.models.ism_api.stock import ISMStockDetailsResponse, ISMTrendingStocksResponse, RecentNews
+from app.models.ism_api.stock import ISMStockDetailsResponse, ISMTrendingStocksResponse, RecentNews, StockQuote, StockRecentNews
 from app.services.ism_api import ISMApi
 
 
@@ -11,70 +16,132 @@ class HelperFunctions:
         self.cache = RedisService()
 
     async def get_cached_data(self, key: str):
-        cached_data = await self.cache.get(key)
-        if cached_data:
-            print(f"Cache hit for {key}")
-            return cached_data
-        print(f"Cache miss for {key}")
+        # Hits and misses are counted per key family by RedisService
+        return await self.cache.get(key)
 
     async def set_cached_data(self, key: str, data, expire_minutes: int = 60):
         await self.cache.set(key, data, expire_minutes=expire_minutes)
-        print(f"Cached data for {key}")
 
     async def cache_news_articles(self, news_articles: List[ISMNewsArticle]):
-        news_cache_key = "news_articles"
-        cached_news = await self.cache.get(news_cache_key)
-        if not cached_news and news_articles:
-            await self.cache.set(news_cache_key, [article.model_dump(by_alias=True) for article in news_articles], expire_minutes=180)
+        news_cache_key = cache_keys.key("news_articles")
+        if news_articles:
+            await self.cache.set(
+                news_cache_key,
+                [article.model_dump(by_alias=True) for article in news_articles],
+                expire_minutes=settings.NEWS_ARTICLES_STALE_TTL_MINUTES,
+                only_if_missing=True,
+                soft_expire_minutes=settings.NEWS_ARTICLES_TTL_MINUTES,
+            )
 
     async def get_cached_news_articles(self) -> List[ISMNewsArticle]:
-        news_cache_key = "news_articles"
-        cached_news = await self.cache.get(news_cache_key)
-        if cached_news:
-            return [ISMNewsArticle(**article) for article in cached_news]
-        else:
+        async def load_news_articles():
             news_articles = await self.ism_api.get_news()
-            await self.cache.set(news_cache_key, [article.model_dump(by_alias=True) for article in news_articles], expire_minutes=180)
-            return news_articles
-
-    async def cache_stock_specific_news(self, recent_news: List[RecentNews], symbol: str):
-        stock_news_cache_key = f"stock_news:{symbol}"
-        cached_stock_news = await self.cache.get(stock_news_cache_key)
-        if not cached_stock_news and recent_news:
-            await self.cache.set(stock_news_cache_key, [news.model_dump(by_alias=True) for news in recent_news], expire_minutes=60)
-
-    async def get_cached_stock_specific_news(self, symbol: str, isin_number: str) -> List[RecentNews]:
-        stock_news_cache_key = f"stock_news:{symbol}"
-        cached_recent_news = await self.cache.get(stock_news_cache_key)
-        if cached_recent_news:
-            return [RecentNews(**news) for news in cached_recent_news]
-
-        stock_cache_key = f"stock_details:{symbol}"
-        cached_stock_details = await self.cache.get(stock_cache_key)
-        if cached_stock_details:
-            stock_details = ISMStockDetailsResponse(**cached_stock_details)
-            stock_recent_news = stock_details.recent_news
-            if stock_recent_news:
-                await self.cache.set(stock_news_cache_key, [news.model_dump(by_alias=True) for news in stock_recent_news], expire_minutes=60)
-                return stock_recent_news
+            return [article.model_dump(by_alias=True) for article in news_articles]
+
+        # Global key, past the soft TTL one worker refreshes it while everyone else is served the cached copy
+        cached_news = await stale_while_revalidate.get(
+            key=cache_keys.key("news_articles"),
+            load=load_news_articles,
+            soft_expire_minutes=settings.NEWS_ARTICLES_TTL_MINUTES,
+            expire_minutes=settings.NEWS_ARTICLES_STALE_TTL_MINUTES,
+        )
+        return [ISMNewsArticle(**article) for article in cached_news]
+
+    async def cache_stock_details(self, symbol: str, stock_details: ISMStockDetailsResponse, quote_expire_minutes: Optional[int] = None) -> StockQuote:
+        """
+        Split stock details into a short-lived quote and long-lived fundamentals.
+        The fundamentals record is the full payload; read prices from the quote.
+        """
+        quote = StockQuote.from_stock_details(stock_details)
+        quote_data = quote.model_dump(by_alias=True)
+        quote_key = cache_keys.key("stock_quote", symbol)
+        entries = [
+            CacheEntry(key=quote_key, value=quote_data, expire_minutes=quote_expire_minutes or settings.STOCK_QUOTE_TTL_MINUTES),
+            # Last known good quote outlives the freshness TTL so it can be served while the upstream is down
+            CacheEntry(key=cache_keys.key("stock_quote_last_good", symbol), value=quote_data, expire_minutes=settings.STOCK_QUOTE_STALE_TTL_MINUTES),
+            CacheEntry(key=cache_keys.key("stock_fundamentals", symbol), value=stock_details.model_dump(by_alias=True), expire_minutes=settings.STOCK_FUNDAMENTALS_TTL_MINUTES, only_if_missing=True),
+        ]
+        if stock_details.recent_news:
+            entries.append(CacheEntry(key=cache_keys.key("stock_news", symbol), value=[news.model_dump(by_alias=True) for news in stock_details.recent_news], expire_minutes=60, only_if_missing=True))
+
+        # One pipelined round trip for every tier this fetch feeds, other workers drop their parsed copies
+        await self.cache.write_many(entries, invalidate_local=True)
+        local_cache.set(quote_key, quote)
+        return quote
+
+    async def get_cached_stock_quotes(self, symbols: List[str], last_good: bool = False) -> Dict[str, StockQuote]:
+        """Cached quotes for symbols in one MGET, missing symbols are left out"""
+        if last_good:
+            cached_quotes = await self.cache.get_models([cache_keys.key("stock_quote_last_good", symbol) for symbol in symbols], StockQuote)
+            return {symbol: stock_quote for symbol, stock_quote in zip(symbols, cached_quotes) if stock_quote}
+
+        # Parsed quotes from the in-process cache first, Redis only for the rest
+        stock_quote_map = {}
+        for symbol in symbols:
+            stock_quote = local_cache.get(cache_keys.key("stock_quote", symbol))
+            if stock_quote is not None:
+                stock_quote_map[symbol] = stock_quote
+
+        missing_symbols = [symbol for symbol in symbols if symbol not in stock_quote_map]
+        cached_quotes = await self.cache.get_models([cache_keys.key("stock_quote", symbol) for symbol in missing_symbols], StockQuote)
+        for symbol, stock_quote in zip(missing_symbols, cached_quotes):
+            if stock_quote:
+                local_cache.set(cache_keys.key("stock_quote", symbol), stock_quote)
+                stock_quote_map[symbol] = stock_quote
+
+        return stock_quote_map
+
+    async def get_cached_stock_specific_news(self, symbols_isin: List[Tuple[str, str]]) -> Dict[str, List[RecentNews]]:
+        """
+        Recent news per symbol, read with a constant number of Redis round trips.
+        Falls back to the cached fundamentals, then to the upstream for what's left.
+        """
+        symbols = [symbol for symbol, _ in symbols_isin]
+        cached_news = await self.cache.get_many([cache_keys.key("stock_news", symbol) for symbol in symbols])
+        stock_news_map = {
+            symbol: [RecentNews(**news) for news in recent_news]
+            for symbol, recent_news in zip(symbols, cached_news)
+            if recent_news
+        }
+
+        missing = [(symbol, isin_number) for symbol, isin_number in symbols_isin if symbol not in stock_news_map]
+        if not missing:
+            return stock_news_map
+
+        # Only the news list is validated, the rest of the fundamentals payload is skipped
+        cached_fundamentals = await self.cache.get_models([cache_keys.key("stock_fundamentals", symbol) for symbol, _ in missing], StockRecentNews)
+        news_to_cache = {}
+        upstream_missing = []
+        for (symbol, isin_number), fundamentals in zip(missing, cached_fundamentals):
+            if fundamentals:
+                recent_news = fundamentals.recent_news or []
+                stock_news_map[symbol] = recent_news
+                if recent_news:
+                    news_to_cache[cache_keys.key("stock_news", symbol)] = [news.model_dump(by_alias=True) for news in recent_news]
             else:
-                return []
-        else:
+                upstream_missing.append((symbol, isin_number))
+        await self.cache.set_many(news_to_cache, expire_minutes=60, only_if_missing=True)
+
+        async def fetch(symbol: str, isin_number: str) -> List[RecentNews]:
             stock_details = await self.ism_api.get_stock_details(isin_number)
-            await self.cache.set(stock_cache_key, stock_details.model_dump(by_alias=True), expire_minutes=5)
-            stock_recent_news = stock_details.recent_news
-            if stock_recent_news:
-                await self.cache.set(stock_news_cache_key, [news.model_dump(by_alias=True) for news in stock_recent_news], expire_minutes=60)
-                return stock_recent_news
-            else:
-                return []
+            await self.cache_stock_details(symbol, stock_details)
+            return stock_details.recent_news or []
+
+        results = await asyncio.gather(*[fetch(symbol, isin_number) for symbol, isin_number in upstream_missing])
+        for (symbol, _), recent_news in zip(upstream_missing, results):
+            stock_news_map[symbol] = recent_news
+
+        return stock_news_map
 
     async def get_cached_trending_stocks(self) -> ISMTrendingStocksResponse:
-        trending_stocks_cache_key = "trending_stocks"
-        cached_trending_stocks = await self.cache.get(trending_stocks_cache_key)
-        if cached_trending_stocks:
-            return ISMTrendingStocksResponse(**cached_trending_stocks)
-        else:
+        async def load_trending_stocks():
             trending_stocks = await self.ism_api.get_trending_stocks()
-            await self.set_cached_data(key=trending_stocks_cache_key, data=trending_stocks.model_dump(by_alias=True), expire_minutes=120)
-            return trending_stocks
\ No newline at end of file
+            return trending_stocks.model_dump(by_alias=True)
+
+        cached_trending_stocks = await stale_while_revalidate.get(
+            key=cache_keys.key("trending_stocks"),
+            load=load_trending_stocks,
+            soft_expire_minutes=settings.TRENDING_STOCKS_TTL_MINUTES,
+            expire_minutes=settings.TRENDING_STOCKS_STALE_TTL_MINUTES,
+        )
+        return ISMTrendingStocksResponse(**cached_trending_stocks)
\ No newline at end of file
@@ -0,0 +1,48 @@
+"""
+Bytes stored and encode/decode cost per cached payload type, for every
+serializer and compressor combination available in this environment.
+
+Run from the repository root:
+    python -m benchmarks.bench_cache_codecs
+"""
+import json
+import timeit
+
+from app.cache.codecs import COMPRESSORS, SERIALIZERS, CacheCodec
+from app.models.ism_api.news import ISMNewsArticle
+from app.models.ism_api.stock import ISMStockDetailsResponse, ISMTrendingStocksResponse
+from benchmarks.fixtures import genai_advisory_payload, news_payload, stock_details_payload, trending_stocks_payload
+
+ITERATIONS = 500
+COMPRESSION_MIN_BYTES = 1024
+
+
+def payloads() -> dict:
+    # Values as the cache helpers pass them to RedisService.set
+    return {
+        "stock_details": ISMStockDetailsResponse(**stock_details_payload()).model_dump(by_alias=True),
+        "news": [ISMNewsArticle(**item).model_dump() for item in news_payload()],
+        "trending_stocks": ISMTrendingStocksResponse(**trending_stocks_payload()).model_dump(),
+        "genai_advisory": genai_advisory_payload(),
+    }
+
+
+def main():
+    print(f"{'payload':<18}{'codec':<18}{'bytes':>10}{'encode us':>12}{'decode us':>12}")
+    for payload_name, value in payloads().items():
+        baseline = len(json.dumps(value).encode())
+        print(f"{payload_name:<18}{'json.dumps (before)':<18}{baseline:>10}")
+        for serializer in SERIALIZERS.values():
+            for compressor in COMPRESSORS.values():
+                codec = CacheCodec(serializer.name, compressor.name, COMPRESSION_MIN_BYTES)
+                encoded = codec.encode(value)
+                assert codec.decode(encoded) == json.loads(json.dumps(value))
+
+                encode_seconds = min(timeit.repeat(lambda: codec.encode(value), number=ITERATIONS, repeat=3)) / ITERATIONS
+                decode_seconds = min(timeit.repeat(lambda: codec.decode(encoded), number=ITERATIONS, repeat=3)) / ITERATIONS
+                codec_name = f"{serializer.name}+{compressor.name}"
+                print(f"{'':<18}{codec_name:<18}{len(encoded):>10}{encode_seconds * 1e6:>12.1f}{decode_seconds * 1e6:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Per-symbol parse cost of a cached stock on the valuation path.
+
+before: json.loads + ISMStockDetailsResponse(**data) of the full stock details blob
+after:  StockQuote.model_validate_json of the slim quote record
+
+Run from the repository root:
+    python -m benchmarks.bench_quote_parsing
+"""
+import json
+import timeit
+
+from app.models.ism_api.stock import ISMStockDetailsResponse, StockQuote
+from benchmarks.fixtures import stock_details_payload
+
+ITERATIONS = 2000
+
+
+def main():
+    stock_details = ISMStockDetailsResponse(**stock_details_payload())
+    full_json = json.dumps(stock_details.model_dump(by_alias=True))
+    quote_json = StockQuote.from_stock_details(stock_details).model_dump_json(by_alias=True)
+
+    def before():
+        details = ISMStockDetailsResponse(**json.loads(full_json))
+        return details.current_price.nse, details.stock_details_reusable_data.close, details.industry
+
+    def after():
+        quote = StockQuote.model_validate_json(quote_json)
+        return quote.current_price.nse, quote.previous_close, quote.industry
+
+    assert before() == after()
+
+    before_seconds = min(timeit.repeat(before, number=ITERATIONS, repeat=5)) / ITERATIONS
+    after_seconds = min(timeit.repeat(after, number=ITERATIONS, repeat=5)) / ITERATIONS
+
+    print(f"{'path':<40}{'bytes':>10}{'us/symbol':>12}")
+    print(f"{'full ISMStockDetailsResponse (before)':<40}{len(full_json):>10}{before_seconds * 1e6:>12.1f}")
+    print(f"{'StockQuote.model_validate_json (after)':<40}{len(quote_json):>10}{after_seconds * 1e6:>12.1f}")
+    print(f"speedup: {before_seconds / after_seconds:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
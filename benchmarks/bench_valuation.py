@@ -0,0 +1,108 @@
+"""
+Portfolio valuation cost at 10, 100 and 1,000 holdings.
+
+before: per-holding Decimal(str(...)) loop previously in PortfolioMetrics.calculate_current_value_and_pnl
+after:  app.services.valuation_engine.value_portfolio
+
+Also checks every output field agrees within valuation_engine.RELATIVE_TOLERANCE.
+
+Run from the repository root:
+    python -m benchmarks.bench_valuation
+"""
+import math
+import timeit
+from collections import defaultdict
+from decimal import Decimal
+
+from app.models.ism_api.stock import StockQuote
+from app.models.portfolio_metrics import HoldingMetrics, PortfolioSummary, SectorAllocation
+from app.services.valuation_engine import RELATIVE_TOLERANCE, value_portfolio
+from benchmarks.fixtures import holding_rows, stock_quote_payload
+
+SIZES = (10, 100, 1000)
+
+
+def decimal_valuation(holdings, stock_quote_map, stale_symbols):
+    holding_metrics_list = []
+    total_invested = Decimal('0')
+    total_current_value = Decimal('0')
+    sector_values = defaultdict(Decimal)
+    sector_holdings = defaultdict(list)
+
+    for holding in holdings:
+        stock_quote = stock_quote_map.get(holding.symbol)
+        if not stock_quote:
+            continue
+
+        current_price = float(stock_quote.current_price.nse or stock_quote.current_price.bse or 0.0)
+        prev_close = float(stock_quote.previous_close or 0.0)
+        industry = stock_quote.industry or "Unknown"
+
+        cost_basis = Decimal(str(holding.shares * holding.avg_cost))
+        current_value = Decimal(str(holding.shares * current_price))
+        unrealized_pnl = current_value - cost_basis
+        unrealized_pnl_pct = (
+            float((Decimal(str(current_price)) - Decimal(str(holding.avg_cost))) / Decimal(str(holding.avg_cost)) * 100)
+            if holding.avg_cost > 0 else 0.0
+        )
+        days_pnl = holding.shares * (current_price - prev_close)
+        sector_values[industry] += current_value
+        sector_holdings[industry].append(holding.symbol)
+
+        holding_metrics_list.append(HoldingMetrics(
+            symbol=holding.symbol, name=holding.name, shares=holding.shares, avg_cost=holding.avg_cost,
+            current_price=current_price, cost_basis=float(cost_basis), current_value=float(current_value),
+            unrealized_pnl=float(unrealized_pnl), unrealized_pnl_pct=unrealized_pnl_pct, days_pnl=days_pnl,
+            weightage=0.0, industry=industry, is_stale=holding.symbol in stale_symbols,
+        ))
+        total_invested += cost_basis
+        total_current_value += current_value
+
+    total_pnl = total_current_value - total_invested
+    total_return_pct = float((total_pnl / total_invested * 100) if total_invested > 0 else Decimal('0'))
+
+    sector_allocations = []
+    for industry, value in sector_values.items():
+        sector_weight = float((value / total_current_value * 100) if total_current_value > 0 else Decimal('0'))
+        sector_allocations.append(SectorAllocation(sector=industry, current_value=float(value), weight=sector_weight, holdings=sector_holdings[industry]))
+
+    for metrics in holding_metrics_list:
+        metrics.weightage = float((Decimal(str(metrics.current_value)) / total_current_value * 100) if total_current_value > 0 else Decimal('0'))
+
+    return holding_metrics_list, PortfolioSummary(
+        total_invested=float(total_invested), total_current_value=float(total_current_value), total_pnl=float(total_pnl),
+        total_return_pct=total_return_pct, sector_allocations=sector_allocations, stale_symbols=sorted(stale_symbols),
+    )
+
+
+def assert_close(expected, actual, path="result"):
+    if isinstance(expected, float):
+        assert math.isclose(expected, actual, rel_tol=RELATIVE_TOLERANCE, abs_tol=1e-9), f"{path}: {expected} != {actual}"
+    elif isinstance(expected, (list, tuple)):
+        assert len(expected) == len(actual), f"{path}: length {len(expected)} != {len(actual)}"
+        for index, (left, right) in enumerate(zip(expected, actual)):
+            assert_close(left, right, f"{path}[{index}]")
+    elif hasattr(expected, "__dataclass_fields__"):
+        for name in expected.__dataclass_fields__:
+            assert_close(getattr(expected, name), getattr(actual, name), f"{path}.{name}")
+    else:
+        assert expected == actual, f"{path}: {expected!r} != {actual!r}"
+
+
+def main():
+    print(f"{'holdings':>10}{'before ms':>12}{'after ms':>12}{'speedup':>10}")
+    for size in SIZES:
+        holdings = holding_rows(size)
+        stock_quote_map = {holding.symbol: StockQuote.model_validate(stock_quote_payload(holding.symbol, i)) for i, holding in enumerate(holdings)}
+        stale_symbols = {holdings[0].symbol}
+
+        assert_close(decimal_valuation(holdings, stock_quote_map, stale_symbols), value_portfolio(holdings, stock_quote_map, stale_symbols))
+
+        number = max(10, 10000 // size)
+        before = min(timeit.repeat(lambda: decimal_valuation(holdings, stock_quote_map, stale_symbols), number=number, repeat=5)) / number
+        after = min(timeit.repeat(lambda: value_portfolio(holdings, stock_quote_map, stale_symbols), number=number, repeat=5)) / number
+        print(f"{size:>10}{before * 1e3:>12.3f}{after * 1e3:>12.3f}{before / after:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
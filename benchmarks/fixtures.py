@@ -0,0 +1,158 @@
+"""Synthetic upstream payloads shaped like stock.indianapi.in responses, for benchmarks."""
+import json
+
+
+def _financial_items(prefix: str, count: int) -> list:
+    return [
+        {"displayName": f"{prefix} item {i}", "key": f"{prefix}{i}", "value": f"{1000 + i}.5", "qoQComp": None, "yqoQComp": None}
+        for i in range(count)
+    ]
+
+
+def _key_metric(key: str, value: str) -> dict:
+    return {"displayName": key, "key": key, "value": value}
+
+
+def stock_details_payload(symbol: str = "TCS", price: float = 3500.5) -> dict:
+    return {
+        "companyName": f"{symbol} Limited",
+        "industry": "IT Services & Consulting",
+        "companyProfile": {
+            "companyDescription": "Lorem ipsum dolor sit amet. " * 80,
+            "mgIndustry": "Software & Programming",
+            "isInId": "INE467B01029",
+            "officers": {"officer": [
+                {
+                    "rank": i, "since": "2017", "firstName": "First", "mI": None, "lastName": f"Officer{i}", "age": "55",
+                    "title": {"startYear": "2017", "startMonth": "2", "startDay": "21", "iD1": "CEO", "abbr1": "CEO",
+                              "iD2": "MD", "abbr2": "MD", "Value": "Chief Executive Officer, Managing Director"},
+                }
+                for i in range(12)
+            ]},
+            "exchangeCodeBse": "532540",
+            "exchangeCodeNse": symbol,
+            "peerCompanyList": [
+                {"tickerId": f"PEER{i}", "companyName": f"Peer {i} Ltd", "priceToBookValueRatio": 12.5, "priceToEarningsValueRatio": 28.1,
+                 "marketCap": 1250000.0, "price": 1500.0 + i, "percentChange": 0.5, "netChange": 7.5, "overallRating": "Bullish",
+                 "yhigh": 2000.0, "ylow": 1200.0}
+                for i in range(10)
+            ],
+        },
+        "currentPrice": {"BSE": f"{price:.2f}", "NSE": f"{price:.2f}"},
+        "stockTechnicalData": [{"days": d, "bsePrice": f"{price - d:.2f}", "nsePrice": f"{price - d:.2f}"} for d in (5, 10, 20, 50, 100, 300)],
+        "percentChange": "1.25",
+        "yearHigh": f"{price * 1.2:.2f}",
+        "yearLow": f"{price * 0.8:.2f}",
+        "financials": [
+            {
+                "stockFinancialMap": {"CAS": _financial_items("cas", 35), "BAL": _financial_items("bal", 40), "INC": _financial_items("inc", 35)},
+                "FiscalYear": str(2024 - i), "EndDate": f"{2024 - i}-03-31", "Type": "Annual",
+                "StatementDate": f"{2024 - i}-03-31", "fiscalPeriodNumber": 0,
+            }
+            for i in range(10)
+        ],
+        "keyMetrics": {
+            "mgmtEffectiveness": [_key_metric("returnOnAverageEquityTrailing12Month", "46.3"), _key_metric("returnOnInvestmentTrailing12Month", "38.1")],
+            "margins": [_key_metric("netProfitMarginPercentTrailing12Month", "19.2"), _key_metric("grossMarginTrailing12Month", "41.0")],
+            "financialstrength": [_key_metric("totalDebtPerTotalEquityMostRecentQuarter", "0.09"), _key_metric("currentRatioMostRecentQuarter", "2.5")],
+            "valuation": [_key_metric("pPerEBasicExcludingExtraordinaryItemsTTM", "30.4"), _key_metric("priceToBookMostRecentQuarter", "14.2")],
+            "incomeStatement": [_key_metric("revenueTrailing12Month", "2400000"), _key_metric("ebitdTrailing12Month", "640000")],
+            "growth": [_key_metric("revenueGrowthRate5Year", "11.2"), _key_metric("epsGrowthRate5Year", "9.8")],
+            "persharedata": [_key_metric("epsIncludingExtraOrdinaryIitemsTrailing12Month", "125.1"), _key_metric("bookValuePerShareMostRecentQuarter", "250.0")],
+            "priceandVolume": [_key_metric("beta", "0.62"), _key_metric("marketCap", "1300000"), _key_metric("averageVolume10Day", None)],
+        },
+        "analystView": [
+            {"colorCode": "#00a", "ratingName": "Buy", "ratingValue": 4, "numberOfAnalystsLatest": "12", "numberOfAnalysts1WeekAgo": "12",
+             "numberOfAnalysts1MonthAgo": "11", "numberOfAnalysts2MonthAgo": "11", "numberOfAnalysts3MonthAgo": "10"}
+            for _ in range(5)
+        ],
+        "riskMeter": {"categoryName": "Low", "stdDev": 1.42},
+        "shareholding": [
+            {"categoryName": name, "displayName": name, "categories": [{"holdingDate": f"2024-0{q}-30", "percentage": "24.5"} for q in range(1, 7)]}
+            for name in ("Promoter", "FII", "MF", "Other DII", "Retail")
+        ],
+        "stockCorporateActionData": {
+            "dividend": [
+                {"tickerId": symbol, "companyName": f"{symbol} Limited", "remarks": "", "recordDate": "2024-07-20", "xdDate": "2024-07-20",
+                 "interimOrFinal": "Interim", "instrumentType": 0, "value": 10.0, "percentage": 1000, "dateOfAnnouncement": "2024-07-11",
+                 "bookClosureStartDate": "", "bookClosureEndDate": "", "sortDate": "2024-07-20"}
+                for _ in range(12)
+            ],
+            "splits": [],
+            "annualGeneralMeeting": [{"tickerId": symbol, "companyName": f"{symbol} Limited", "remarks": "", "agmDate": "2024-06-01"}],
+            "boardMeetings": [{"tickerId": symbol, "companyName": f"{symbol} Limited", "remarks": "", "boardMeetDate": "2024-07-11", "purpose": "Results"}] * 8,
+        },
+        "stockDetailsReusableData": {
+            "close": f"{price * 0.99:.2f}", "date": "2024-07-25", "time": "15:30:00", "price": f"{price:.2f}", "percentChange": "1.25",
+            "marketCap": "1300000", "yhigh": f"{price * 1.2:.2f}", "ylow": f"{price * 0.8:.2f}", "high": f"{price * 1.01:.2f}", "low": f"{price * 0.98:.2f}",
+        },
+        "recentNews": [
+            {"id": i, "headline": f"{symbol} headline {i}", "intro": "Intro text " * 10, "date": "2024-07-25T10:00:00",
+             "url": f"https://example.com/news/{i}", "body": "Body text " * 120}
+            for i in range(10)
+        ],
+    }
+
+
+def news_payload(count: int = 50) -> list:
+    return [
+        {"title": f"Market headline {i}", "summary": "Summary text " * 20, "url": f"https://example.com/market/{i}",
+         "image_url": f"https://example.com/img/{i}.jpg", "pub_date": "2024-07-25T09:15:00", "source": "Example Wire",
+         "topics": ["markets", "economy"]}
+        for i in range(count)
+    ]
+
+
+def trending_stock_payload(ticker: str) -> dict:
+    fields = ["price", "percent_change", "net_change", "bid", "ask", "high", "low", "open", "low_circuit_limit", "up_circuit_limit",
+              "volume", "close", "bid_size", "ask_size", "lot_size", "total_share_outstanding", "year_low", "year_high"]
+    payload = {name: "123.45" for name in fields}
+    payload.update({"ticker_id": ticker, "company_name": f"{ticker} Ltd", "date": "2024-07-25", "time": "15:30:00",
+                    "exchange_type": "NSI", "overall_rating": "Bullish", "short_term_trends": "Bullish",
+                    "long_term_trends": "Moderately Bullish", "ric": f"{ticker}.NS"})
+    return payload
+
+
+def trending_stocks_payload(count: int = 10) -> dict:
+    return {"trending_stocks": {
+        "top_gainers": [trending_stock_payload(f"GAIN{i}") for i in range(count)],
+        "top_losers": [trending_stock_payload(f"LOSE{i}") for i in range(count)],
+    }}
+
+
+def genai_advisory_payload(holdings: int = 15) -> str:
+    """Raw model output as cached by the GenAI endpoints, a JSON document held in a string"""
+    return json.dumps({
+        "portfolio_health": "The portfolio is up 1.8% today, led by IT and private banks, with concentration risk in large caps. " * 3,
+        "notable_movers": [
+            {"symbol": f"SYM{i}", "reason": "Shares rallied after quarterly results beat street estimates on margin expansion and deal wins."}
+            for i in range(holdings)
+        ],
+        "actionable_insight": "Consider trimming the top position, which now exceeds 25% of portfolio value, and rebalancing into defensives. " * 2,
+    })
+
+
+INDUSTRIES = ("IT Services & Consulting", "Banks", "Oil & Gas", "Pharmaceuticals", "Automobiles", "FMCG", "Metals", "Power")
+
+
+def stock_quote_payload(symbol: str, index: int) -> dict:
+    """Cached StockQuote record, prices vary deterministically with index"""
+    price = 100.0 + (index * 37) % 4000 + 0.35
+    return {
+        "companyName": f"{symbol} Limited",
+        "industry": INDUSTRIES[index % len(INDUSTRIES)],
+        "currentPrice": {"BSE": f"{price:.2f}", "NSE": f"{price:.2f}"},
+        "previousClose": f"{price * 0.99:.2f}",
+        "percentChange": "1.01",
+        "beta": 0.8 + (index % 5) / 10,
+    }
+
+
+def holding_rows(count: int) -> list:
+    """Plain holding records with the attributes valuation reads from app.schemas.holding.Holding"""
+    from types import SimpleNamespace
+
+    return [
+        SimpleNamespace(symbol=f"SYM{i}", name=f"Symbol {i}", isin_number=f"INE{i:06d}01", shares=5 + i % 200, avg_cost=90.0 + (i * 41) % 3900 + 0.15)
+        for i in range(count)
+    ]
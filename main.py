@@ -1,12 +1,39 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from app.api.routes import holdings as holdings_router
 from app.api.routes import auth as auth_router
 from app.api.routes import portfolio as portfolio_router
 from app.api.routes import investment_preferences as investment_preferences_router
+from app.api.routes import metrics as metrics_router
+from app.cache.keys import cache_keys
+from app.cache.local_cache import cache_invalidation_listener
+from app.cache.redis import close_redis, init_redis
+from app.core.config import settings
+from app.services.ism_api import ism_api
+from app.services.price_warmer import price_warmer
+from app.services.value_at_risk import close_executor
 
-app = FastAPI(title="The Alps", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await init_redis()
+    await cache_keys.load_generation()
+    cache_invalidation_listener.start()
+    await ism_api.start()
+    if settings.PRICE_WARMER_ENABLED:
+        price_warmer.start()
+    try:
+        yield
+    finally:
+        await price_warmer.stop()
+        await ism_api.close()
+        await cache_invalidation_listener.stop()
+        await close_redis()
+        close_executor()
+
+app = FastAPI(title="The Alps", version="1.0.0", lifespan=lifespan)
 
 app.include_router(auth_router.router)
 app.include_router(holdings_router.router)
 app.include_router(portfolio_router.router)
 app.include_router(investment_preferences_router.router)
+app.include_router(metrics_router.router)